@@ -26,16 +26,22 @@ A股买点扫描器 - Powered by chan.py (tkinter版本)
 使用方法:
     python App/ashare_bsp_scanner_tk.py
 """
+import asyncio
+import io
+import os
 import sys
 import gc
+import time
+from collections import deque
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterable, Set
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
 import queue
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 
 # 将项目根目录加入路径（兼容 PyInstaller 打包）
 def _setup_path():
@@ -73,16 +79,23 @@ _setup_exception_hooks()
 
 import matplotlib
 matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
 
 import akshare as ak
+import numpy as np
 import pandas as pd
 
+try:
+    import httpx
+except ImportError:
+    # 未安装 httpx 时退回线程池逐只下载
+    httpx = None
+
 from Chan import CChan
 from ChanConfig import CChanConfig
 from Common.CEnum import AUTYPE, DATA_SRC, KL_TYPE
+from DataAPI.AkshareAPI import CAkshare
 
 
 # 买卖点风险系数（5星制，星越多风险越低/确定性越高）
@@ -95,6 +108,12 @@ BSP_RISK_RATING = {
     "3b": 2,   # 三类买卖点(中枢前) - 中枢进入，风险较高
 }
 
+# 去掉买卖点类型前缀b/s的转换表
+_BSP_PREFIX_TABLE = str.maketrans('', '', 'bs')
+
+# 风险系数星级显示（按评级0-5索引）
+_RISK_STARS = ("☆☆☆☆☆", "★☆☆☆☆", "★★☆☆☆", "★★★☆☆", "★★★★☆", "★★★★★")
+
 # 风险系数说明
 BSP_RISK_DESC = {
     "1": "趋势背驰，最经典可靠的买卖点",
@@ -217,6 +236,54 @@ FILTER_LOGIC_DOC = """
 """
 
 
+# 实时行情短时缓存，扫描启动和回测在短时间内重复请求时直接复用
+SPOT_CACHE_TTL = 30
+_spot_cache: Dict = {'ts': 0.0, 'df': None, 'prices': None}
+_spot_lock = threading.Lock()
+
+
+def get_spot_df(max_age: float = SPOT_CACHE_TTL) -> pd.DataFrame:
+    """
+    获取A股实时行情（ak.stock_zh_a_spot_em），max_age 秒内复用上一次的结果
+
+    返回的 DataFrame 在调用方之间共享，只读使用
+    """
+    with _spot_lock:
+        if _spot_cache['df'] is None or time.monotonic() - _spot_cache['ts'] > max_age:
+            _spot_cache['df'] = ak.stock_zh_a_spot_em()
+            _spot_cache['prices'] = None
+            _spot_cache['ts'] = time.monotonic()
+        return _spot_cache['df']
+
+
+def get_spot_prices(max_age: float = SPOT_CACHE_TTL) -> Dict[str, float]:
+    """
+    代码 -> 最新价 的哈希表，每份行情只构建一次，之后按代码 O(1) 查询
+
+    无价格（停牌）的股票值为 NaN；代码重复时保留第一条
+    """
+    df = get_spot_df(max_age)
+    with _spot_lock:
+        if _spot_cache['df'] is df and _spot_cache['prices'] is not None:
+            return _spot_cache['prices']
+    codes = df['代码'].astype(str).to_numpy()
+    prices = pd.to_numeric(df['最新价'], errors='coerce').to_numpy(dtype=np.float64)
+    price_map = dict(zip(codes[::-1], prices[::-1]))
+    with _spot_lock:
+        if _spot_cache['df'] is df:
+            _spot_cache['prices'] = price_map
+    return price_map
+
+
+# 股票代码前缀常量（模块加载时构建一次，每次扫描直接复用）
+_EXCLUDED_PREFIXES = ('200', '900', '920')  # 深圳B股、上海B股、存托凭证CDR
+# 板块前缀以正则片段表示，主板 00 开头需排除 003，用负向前瞻合并到同一次匹配中
+_MAIN_PREFIXES = ('60', '00(?!3)')
+_GEM_PREFIXES = ('300', '301')
+_STAR_PREFIXES = ('688',)
+_BSE_PREFIXES = ('8', '43')
+
+
 def get_tradable_stocks(include_main: bool = True,
                         include_gem: bool = False,
                         include_star: bool = False,
@@ -243,70 +310,71 @@ def get_tradable_stocks(include_main: bool = True,
     Returns:
         pd.DataFrame: 包含 ['代码', '名称', '最新价', '涨跌幅', '总市值'] 列的股票列表
     """
-    import time
+    # 阈值统一为 float64 标量，与行情数组同类型比较，避免逐次类型提升
+    min_price, max_price = np.float64(min_price), np.float64(max_price)
+    min_market_cap, max_market_cap = np.float64(min_market_cap), np.float64(max_market_cap)
 
     for attempt in range(max_retries):
         try:
             # 获取A股实时行情（增加超时重试）
             print(f"正在获取股票列表... (尝试 {attempt + 1}/{max_retries})")
-            df = ak.stock_zh_a_spot_em()
+            df = get_spot_df()
 
-            # 1. 剔除ST股票（名称包含ST）
-            df = df[~df['名称'].str.contains('ST', case=False, na=False)]
+            # 所有过滤条件合成一个布尔掩码，最后只切片一次
+            codes = df['代码'].astype(str)
+            price = df['最新价'].to_numpy(dtype=np.float64, na_value=np.nan)
+            volume = df['成交量'].to_numpy(dtype=np.float64, na_value=np.nan)
 
-            # 2. 剔除B股（200开头深圳B股，900开头上海B股）
-            df = df[~df['代码'].str.startswith('200')]
-            df = df[~df['代码'].str.startswith('900')]
+            # 1. 剔除ST股票（名称包含ST，统一转大写后按纯文本匹配，避免正则开销）
+            mask = ~df['名称'].str.upper().str.contains('ST', regex=False, na=False).to_numpy(dtype=bool)
 
+            # 2. 剔除B股（200开头深圳B股，900开头上海B股）
             # 3. 剔除存托凭证CDR（920开头）
-            df = df[~df['代码'].str.startswith('920')]
+            mask &= ~codes.str.startswith(_EXCLUDED_PREFIXES).to_numpy(dtype=bool)
 
             # 4. 剔除停牌股票（成交量为0）
-            df = df[df['成交量'] > 0]
-
             # 5. 剔除异常股票（最新价<=0）
-            df = df[df['最新价'] > 0]
+            mask &= (volume > 0) & (price > 0)
 
-            # 6. 根据配置过滤板块
-            conditions = []
+            # 6. 根据配置过滤板块（所有允许的前缀合成一个正则，一次匹配）
+            allowed_prefixes = ()
 
             if include_main:
                 # 主板：沪市60开头，深市00开头（排除创业板300）
-                conditions.append(df['代码'].str.startswith('60'))
-                conditions.append(df['代码'].str.startswith('00') & ~df['代码'].str.startswith('003'))
+                allowed_prefixes += _MAIN_PREFIXES
 
             if include_gem:
                 # 创业板：300开头
-                conditions.append(df['代码'].str.startswith('300') | df['代码'].str.startswith('301'))
+                allowed_prefixes += _GEM_PREFIXES
 
             if include_star:
                 # 科创板：688开头
-                conditions.append(df['代码'].str.startswith('688'))
+                allowed_prefixes += _STAR_PREFIXES
 
             if include_bse:
                 # 北交所：8开头、43开头
-                conditions.append(df['代码'].str.startswith('8'))
-                conditions.append(df['代码'].str.startswith('43'))
+                allowed_prefixes += _BSE_PREFIXES
 
-            if conditions:
-                combined_condition = conditions[0]
-                for cond in conditions[1:]:
-                    combined_condition = combined_condition | cond
-                df = df[combined_condition]
+            if allowed_prefixes:
+                board_pattern = '|'.join(allowed_prefixes)
+                mask &= codes.str.match(board_pattern).to_numpy(dtype=bool)
 
             # 7. 价格区间过滤
-            df = df[(df['最新价'] >= min_price) & (df['最新价'] <= max_price)]
+            mask &= (price >= min_price) & (price <= max_price)
 
             # 8. 总市值过滤（单位：亿元，原始数据单位为元）
             if '总市值' in df.columns:
                 # 将总市值从元转换为亿元进行比较
-                df['总市值_亿'] = df['总市值'] / 1e8
-                df = df[(df['总市值_亿'] >= min_market_cap) & (df['总市值_亿'] <= max_market_cap)]
+                market_cap = df['总市值'].to_numpy(dtype=np.float64, na_value=np.nan) / 1e8
+                mask &= (market_cap >= min_market_cap) & (market_cap <= max_market_cap)
             else:
-                df['总市值_亿'] = 0
+                market_cap = np.zeros(len(df))
+
+            df = df.loc[mask, ['代码', '名称', '最新价', '涨跌幅']].reset_index(drop=True)
+            df['总市值'] = market_cap[mask]
 
             print(f"成功获取 {len(df)} 只股票")
-            return df[['代码', '名称', '最新价', '涨跌幅', '总市值_亿']].rename(columns={'总市值_亿': '总市值'}).reset_index(drop=True)
+            return df
 
         except Exception as e:
             error_msg = str(e)
@@ -322,16 +390,530 @@ def get_tradable_stocks(include_main: bool = True,
                 return pd.DataFrame()
 
 
+# 日线K线本地缓存目录
+KLINE_CACHE_DIR = Path.home() / ".chantrader_cache"
+
+
+class KlineDiskCache:
+    """
+    日线K线本地缓存（Parquet + zstd），每只股票一个文件
+
+    再次扫描时只下载缓存最后一天及之后的数据。最后一天会被重新下载：
+    前复权价格在除权除息后会整体变化，若该K线收盘价与缓存不一致（或新数据不从该日开始，无法比对）
+    则放弃缓存全量下载。收盘前扫描时当天K线尚未走完，不写入缓存
+    """
+
+    # 缓存首根K线晚于请求起始日超过该天数时视为缓存不覆盖请求区间（容忍节假日停市）
+    COVER_TOLERANCE = pd.Timedelta(days=15)
+    # A股收盘时间，此前当天的日K线仍在变化
+    MARKET_CLOSE = pd.Timedelta(hours=15)
+
+    def __init__(self, cache_dir: Path = KLINE_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, code: str) -> Path:
+        return self.cache_dir / f"{code}.parquet"
+
+    def lookup(self, code: str, begin_date: str) -> Tuple[Optional[pd.DataFrame], str]:
+        """
+        Returns:
+            Tuple: (缓存数据或None, 需要下载的起始日期)
+        """
+        path = self._path(code)
+        if not path.exists():
+            return None, begin_date
+        try:
+            cached = pd.read_parquet(path)
+        except Exception:
+            return None, begin_date
+        if cached.empty or cached['日期'].iloc[0] - pd.Timestamp(begin_date) > self.COVER_TOLERANCE:
+            return None, begin_date
+        return cached, cached['日期'].iloc[-1].strftime("%Y-%m-%d")
+
+    def merge(self, code: str, cached: Optional[pd.DataFrame], fresh: pd.DataFrame,
+              begin_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """
+        合并新下载的数据并写回缓存
+
+        Returns:
+            Optional[pd.DataFrame]: [begin_date, end_date] 区间的K线；复权价格发生变化时返回 None，需全量重新下载
+        """
+        fresh = fresh.copy()
+        fresh['日期'] = pd.to_datetime(fresh['日期'])
+        if cached is not None:
+            # 新数据必须从缓存最后一天开始才能核对复权价格，否则按缓存失效处理
+            if fresh.empty or fresh['日期'].iloc[0] != cached['日期'].iloc[-1] or \
+                    not np.isclose(fresh['收盘'].iloc[0], cached['收盘'].iloc[-1]):
+                return None
+            fresh = pd.concat([cached, fresh]).drop_duplicates('日期', keep='last').reset_index(drop=True)
+
+        # 收盘前当天的K线还会变化，只缓存已走完的交易日，下次从最后一个完整交易日续传
+        now = pd.Timestamp.now()
+        today = now.normalize()
+        finished = fresh
+        if now < today + self.MARKET_CLOSE:
+            finished = fresh[fresh['日期'] < today]
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path(code).with_suffix('.tmp')
+            finished.to_parquet(tmp_path, compression='zstd', index=False)
+            os.replace(tmp_path, self._path(code))
+        except Exception:
+            # 缺少 pyarrow 或磁盘不可写时仅跳过缓存
+            pass
+
+        # 日期有序时二分定位区间，避免整列比较
+        if not fresh['日期'].is_monotonic_increasing:
+            fresh = fresh.sort_values('日期', kind='stable', ignore_index=True)
+        dates = fresh['日期'].to_numpy()
+        start = np.searchsorted(dates, np.datetime64(begin_date), side='left')
+        stop = np.searchsorted(dates, np.datetime64(end_date), side='right')
+        return fresh.iloc[start:stop].reset_index(drop=True)
+
+
+_kline_cache = KlineDiskCache()
+
+
+class AsyncKlineFetcher:
+    """
+    异步批量下载日线数据
+
+    在独立线程的事件循环中复用同一个 httpx 连接池并发请求东方财富K线接口
+    （即 ak.stock_zh_a_hist 使用的接口）
+    """
+
+    KLINE_URL = "https://push2his.eastmoney.com/api/qt/stock/kline/get"
+    KLINE_COLUMNS = ['日期', '开盘', '收盘', '最高', '最低', '成交量', '成交额', '振幅', '涨跌幅', '涨跌额', '换手率']
+    ADJUST_DICT = {AUTYPE.QFQ: "1", AUTYPE.HFQ: "2", AUTYPE.NONE: "0"}
+
+    def __init__(self, max_connections: int = 32, autype: AUTYPE = AUTYPE.QFQ):
+        self.autype = autype
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections),
+            timeout=httpx.Timeout(15.0, pool=None),
+        )
+
+    def submit(self, code: str, begin_date: str, end_date: str) -> Future:
+        """提交一只股票的下载任务，返回可用 add_done_callback 串联的 Future"""
+        return asyncio.run_coroutine_threadsafe(self._fetch(code, begin_date, end_date), self.loop)
+
+    async def _fetch(self, code: str, begin_date: str, end_date: str) -> pd.DataFrame:
+        # 缓存读写（parquet 读写、DataFrame 合并）放到默认线程池，事件循环线程只负责网络请求
+        loop = asyncio.get_running_loop()
+        cached, fetch_begin = await loop.run_in_executor(None, _kline_cache.lookup, code, begin_date)
+        fresh = await self._request(code, fetch_begin, end_date)
+        df = await loop.run_in_executor(None, _kline_cache.merge, code, cached, fresh, begin_date, end_date)
+        if df is None:
+            fresh = await self._request(code, begin_date, end_date)
+            df = await loop.run_in_executor(None, _kline_cache.merge, code, None, fresh, begin_date, end_date)
+        return df
+
+    async def _request(self, code: str, begin_date: str, end_date: str) -> pd.DataFrame:
+        params = {
+            "fields1": "f1,f2,f3,f4,f5,f6",
+            "fields2": "f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61",
+            "ut": "7eea3edcaed734bea9cbfc24409ed989",
+            "klt": "101",
+            "fqt": self.ADJUST_DICT.get(self.autype, "1"),
+            "secid": f"{1 if code.startswith('6') else 0}.{code}",
+            "beg": begin_date.replace("-", ""),
+            "end": end_date.replace("-", ""),
+        }
+        resp = await self.client.get(self.KLINE_URL, params=params)
+        resp.raise_for_status()
+        klines = (resp.json().get("data") or {}).get("klines") or []
+
+        df = pd.DataFrame([line.split(",") for line in klines], columns=self.KLINE_COLUMNS)
+        numeric_columns = self.KLINE_COLUMNS[1:]
+        df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors='coerce')
+        return df
+
+    def close(self):
+        """关闭连接池并停止事件循环"""
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.aclose(), self.loop).result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
 def get_bsp_risk_rating(bsp_type: str) -> int:
     """获取买卖点风险系数（1-5星）"""
     # 提取基础类型（去掉前缀b/s）
-    base_type = bsp_type.lower().replace('b', '').replace('s', '')
+    base_type = bsp_type.lower().translate(_BSP_PREFIX_TABLE)
     return BSP_RISK_RATING.get(base_type, 3)
 
 
+def rate_bsp_types(bsp_types) -> np.ndarray:
+    """批量获取买卖点风险系数，与 get_bsp_risk_rating 规则一致"""
+    base_types = pd.Series(bsp_types, dtype=object).str.lower().str.translate(_BSP_PREFIX_TABLE)
+    return base_types.map(BSP_RISK_RATING).fillna(3).astype('int8').to_numpy()
+
+
 def get_risk_stars(rating: int) -> str:
     """将评级转换为星星显示"""
-    return "★" * rating + "☆" * (5 - rating)
+    return _RISK_STARS[min(max(rating, 0), 5)]
+
+
+# 导出文件中机器可读数据段（TSV）的起止标记，供导入回测解析
+BACKTEST_DATA_BEGIN = "### DATA ###"
+BACKTEST_DATA_END = "### END ###"
+
+# 扫描结果表的列及类型
+STOCK_DF_DTYPES = {
+    'code': object,
+    'name': object,
+    'price': 'float32',
+    'change': 'float32',
+    'risk_rating': 'int8',
+    'resonance_count': 'int8',
+    'resonance_str': object,
+    'bsp_type': object,
+}
+
+
+def build_stock_df(stock_data: List[Dict]) -> pd.DataFrame:
+    """将扫描结果字典列表转换为按列存储的 DataFrame（索引为 stock_data 中的位置）"""
+    return pd.DataFrame(stock_data, columns=list(STOCK_DF_DTYPES)).astype(STOCK_DF_DTYPES)
+
+
+def format_stock_rows(stock_data: List[Dict]) -> List[Tuple]:
+    """
+    批量生成股票列表的表格显示行
+
+    Args:
+        stock_data: 扫描结果字典列表
+
+    Returns:
+        List[Tuple]: 与 stock_data 一一对应的 (代码, 名称, 现价, 涨跌%, 风险系数, 共振, 买点类型) 元组
+    """
+    if not stock_data:
+        return []
+
+    df = pd.DataFrame(stock_data, columns=['code', 'name', 'price', 'change', 'risk_rating',
+                                           'resonance_count', 'resonance_str', 'bsp_type'])
+    price = df['price'].map('{:.2f}'.format)
+    change = df['change'].map('{:+.2f}%'.format)
+    risk = df['risk_rating'].clip(0, 5).map(_RISK_STARS.__getitem__)
+    # 共振显示：有共振显示级别，无共振显示"-"
+    resonance = np.where(df['resonance_count'].fillna(1).to_numpy() >= 2,
+                         df['resonance_str'].fillna('-').to_numpy(), '-')
+    # 只显示买点类型，不含共振信息
+    bsp = df['bsp_type'].str.split('(', n=1).str[0]
+
+    return list(zip(df['code'], df['name'], price, change, risk, resonance, bsp))
+
+
+def bulk_insert_rows(tree: ttk.Treeview, rows: Iterable[Tuple[Optional[str], Tuple, Tuple]]):
+    """
+    批量插入表格行
+
+    Args:
+        tree: 目标表格
+        rows: (iid, values, tags) 序列，iid 为 None 时由表格自动生成
+
+    插入期间隐藏数据列，避免每插入一行都重新计算一次列布局。
+    Treeview 定位 end 需要从头遍历兄弟节点，空表时改为倒序插入到位置 0，显示顺序不变
+    """
+    display_columns = tree.cget('displaycolumns')
+    tree.configure(displaycolumns=())
+    try:
+        if tree.get_children():
+            for iid, values, tags in rows:
+                tree.insert('', tk.END, iid=iid, values=values, tags=tags)
+        else:
+            for iid, values, tags in reversed(list(rows)):
+                tree.insert('', 0, iid=iid, values=values, tags=tags)
+    finally:
+        tree.configure(displaycolumns=display_columns)
+
+
+def clear_tree(tree: ttk.Treeview):
+    """一次调用删除表格的全部行"""
+    children = tree.get_children()
+    if children:
+        tree.delete(*children)
+
+
+def compute_backtest_stats(results: List[Dict]) -> Dict:
+    """
+    统计回测结果（忽略无当前价格的股票）
+
+    Returns:
+        Dict: valid/avg_return/win_rate/max_gain/max_loss/winners/losers/flat，无有效数据时只有 valid=0
+    """
+    # 一次遍历同时累计总和、最值和涨跌家数
+    valid = winners = losers = flat = 0
+    total = 0.0
+    max_gain, max_loss = float('-inf'), float('inf')
+    for r in results:
+        pct = r['change_pct']
+        if pct is None:
+            continue
+        valid += 1
+        total += pct
+        if pct > max_gain:
+            max_gain = pct
+        if pct < max_loss:
+            max_loss = pct
+        if pct > 0:
+            winners += 1
+        elif pct < 0:
+            losers += 1
+        else:
+            flat += 1
+    if valid == 0:
+        return {'valid': 0}
+
+    return {
+        'valid': valid,
+        'avg_return': total / valid,
+        'win_rate': winners / valid * 100,
+        'max_gain': max_gain,
+        'max_loss': max_loss,
+        'winners': winners,
+        'losers': losers,
+        'flat': flat,
+    }
+
+
+def format_backtest_line(r: Dict) -> str:
+    """回测报告详细数据中的一行，列宽与表头一致"""
+    if r['cur_price'] is None:
+        cur, change, change_pct = '无数据', '-', '-'
+    else:
+        cur, change, change_pct = f"{r['cur_price']:.2f}", f"{r['change']:+.2f}", f"{r['change_pct']:+.2f}%"
+    return f"{r['code']:<10}{r['name']:<12}{r['rec_price']:<10.2f}{cur:<10}{change:<10}{change_pct:<10}\n"
+
+
+def find_recent_buy_point(bsp_list: List, cutoff: datetime):
+    """
+    返回买点日期不早于 cutoff 的最新一个买点，没有则返回 None
+
+    bsp_list 需按从新到旧排列（get_latest_bsp(number=0) 的顺序），
+    遇到早于截止日期的买卖点即可停止，后面的只会更早
+    """
+    # 买点只有日期精度：cutoff 带时分秒时，当天的买点也早于 cutoff
+    cutoff_day = cutoff.date()
+    if cutoff.time() != datetime.min.time():
+        cutoff_day += timedelta(days=1)
+    cutoff_tuple = (cutoff_day.year, cutoff_day.month, cutoff_day.day)
+
+    for bsp in bsp_list:
+        bsp_time = bsp.klu.time
+        if (bsp_time.year, bsp_time.month, bsp_time.day) < cutoff_tuple:
+            return None
+        if bsp.is_buy:
+            return bsp
+    return None
+
+
+def scanner_chan_conf(bi_strict: bool) -> dict:
+    """扫描器使用的缠论配置参数"""
+    return {
+        "bi_strict": bi_strict,
+        "trigger_step": False,
+        "skip_step": 0,
+        "divergence_rate": float("inf"),
+        "bsp2_follow_1": False,
+        "bsp3_follow_1": False,
+        "min_zs_cnt": 0,
+        "bs1_peak": False,
+        "macd_algo": "peak",
+        "bs_type": "1,1p,2,2s,3a,3b",
+        "print_warning": False,
+        "zs_algo": "normal",
+    }
+
+
+# 计算进程内共用的缠论配置和停止标志，由进程池 initializer 设置
+_worker_chan_config: Optional[CChanConfig] = None
+_worker_stop_event = None
+
+
+def _init_scan_worker(chan_conf: dict, stop_event=None):
+    """计算进程初始化：每个进程只构造一次 CChanConfig，并记录扫描停止标志"""
+    global _worker_chan_config, _worker_stop_event
+    _worker_chan_config = CChanConfig(chan_conf)
+    _worker_stop_event = stop_event
+
+
+def _scan_stopped() -> bool:
+    """计算进程中检查用户是否已停止扫描"""
+    return _worker_stop_event is not None and _worker_stop_event.is_set()
+
+
+# 少于该数量的日线不足以形成有效的笔/线段/中枢，扫描时直接跳过
+MIN_KLINE_BARS = 60
+
+
+def precheck_klines(kline_df: pd.DataFrame, cutoff: datetime) -> Optional[str]:
+    """
+    用已下载的日线做廉价预检，判断是否不可能存在 cutoff 之后的买点
+
+    买点都落在向下笔的终点，即底分型的最低K线上。若从截止日前一根起最低价逐根抬高，
+    区间内不存在底分型，也就不可能有近期买点。
+
+    Returns:
+        Optional[str]: 可以跳过时返回跳过原因，否则返回 None
+    """
+    if len(kline_df) < MIN_KLINE_BARS:
+        return 'K线数据不足'
+    dates = pd.to_datetime(kline_df['日期']).to_numpy()
+    start = np.searchsorted(dates, np.datetime64(cutoff.date()), side='left')
+    if start >= len(dates):
+        return '近期无交易'
+    lows = kline_df['最低'].to_numpy(dtype=np.float64)[max(start - 1, 0):]
+    if len(lows) >= 2 and np.all(np.diff(lows) > 0):
+        return '近期单边上涨'
+    return None
+
+
+def analyze_stock_bsp(code: str, name: str, price: float, change: float,
+                      bsp_days: int, history_days: int, use_nesting: bool,
+                      config: Optional[CChanConfig], kline_df: Optional[pd.DataFrame] = None,
+                      keep_chan: bool = True, scan_time: Optional[datetime] = None) -> Dict:
+    """
+    分析单只股票的近期买点（不依赖界面对象，可在子进程中执行）
+
+    Args:
+        config: 缠论配置，为 None 时使用计算进程初始化时构造的配置
+        kline_df: 已下载的日线数据，为 None 时由 CChan 自行下载
+        keep_chan: 是否在结果中保留 CChan 对象（跨进程时不保留，避免序列化整个缠论结构）
+        scan_time: 本轮扫描的基准时间，批量扫描时统一传入，所有日期区间和截止时间都由它推算
+
+    Returns:
+        Dict: 买点信息字典（status 为 found/skip/error）
+    """
+    try:
+        config = config or _worker_chan_config
+        now = scan_time or datetime.now()
+        begin_time = (now - timedelta(days=history_days)).strftime("%Y-%m-%d")
+        end_time = now.strftime("%Y-%m-%d")
+        cutoff_date = now - timedelta(days=bsp_days)
+        if kline_df is not None:
+            # 廉价预检：不可能有近期买点时直接跳过缠论计算
+            skip_reason = precheck_klines(kline_df, cutoff_date)
+            if skip_reason is not None:
+                return {'status': 'skip', 'reason': skip_reason}
+
+        # 已停止扫描时，排队中和正在计算的任务都尽快结束（在登记预取数据之前返回，避免数据滞留）
+        if _scan_stopped():
+            return {'status': 'skip', 'reason': '扫描已停止'}
+        if kline_df is not None:
+            CAkshare.put_prefetched(code, KL_TYPE.K_DAY, begin_time, end_time, AUTYPE.QFQ, kline_df)
+
+        # 日线分析
+        chan_day = CChan(
+            code=code,
+            begin_time=begin_time,
+            end_time=end_time,
+            data_src=DATA_SRC.AKSHARE,
+            lv_list=[KL_TYPE.K_DAY],
+            config=config,
+            autype=AUTYPE.QFQ,
+        )
+
+        # 检查数据有效性
+        if len(chan_day[0]) == 0:
+            return {'status': 'skip', 'reason': '无K线数据'}
+
+        # 检查日线买点
+        bsp_list = chan_day.get_latest_bsp(number=0)
+        latest_buy = find_recent_buy_point(bsp_list, cutoff_date)
+
+        if latest_buy is None:
+            return {'status': 'skip', 'reason': '无近期买点'}
+
+        bsp_type = latest_buy.type2str()
+        base_rating = get_bsp_risk_rating(bsp_type)
+        resonance_count = 1
+        resonance_levels = ["日线"]
+
+        # 区间套共振检查
+        if use_nesting and not _scan_stopped():
+            min30_days = max(history_days // 10, 30)
+            min30_begin = (now - timedelta(days=min30_days)).strftime("%Y-%m-%d")
+            min5_days = min(5, max(history_days // 30, 3))
+            min5_begin = (now - timedelta(days=min5_days)).strftime("%Y-%m-%d")
+
+            # 两个分钟级别并发下载（退出 with 时等待完成），下载失败时由 CChan 自行重新下载
+            with ThreadPoolExecutor(max_workers=2) as fetch_pool:
+                fetch_pool.submit(CAkshare.prefetch, code, KL_TYPE.K_30M, min30_begin, end_time, AUTYPE.QFQ)
+                fetch_pool.submit(CAkshare.prefetch, code, KL_TYPE.K_5M, min5_begin, end_time, AUTYPE.QFQ)
+
+            # 30分钟级别
+            try:
+                chan_30m = CChan(
+                    code=code,
+                    begin_time=min30_begin,
+                    end_time=end_time,
+                    data_src=DATA_SRC.AKSHARE,
+                    lv_list=[KL_TYPE.K_30M],
+                    config=config,
+                    autype=AUTYPE.QFQ,
+                )
+
+                if len(chan_30m[0]) > 0:
+                    bsp_30m = chan_30m.get_latest_bsp(number=0)
+                    cutoff_30m = now - timedelta(days=5)
+                    if find_recent_buy_point(bsp_30m, cutoff_30m) is not None:
+                        resonance_count += 1
+                        resonance_levels.append("30分")
+            except Exception:
+                pass
+
+            if _scan_stopped():
+                # 不再计算5分钟级别，丢弃其预取数据
+                CAkshare.discard_prefetched(code, KL_TYPE.K_5M, min5_begin, end_time, AUTYPE.QFQ)
+                return {'status': 'skip', 'reason': '扫描已停止'}
+
+            # 5分钟级别
+            try:
+                chan_5m = CChan(
+                    code=code,
+                    begin_time=min5_begin,
+                    end_time=end_time,
+                    data_src=DATA_SRC.AKSHARE,
+                    lv_list=[KL_TYPE.K_5M],
+                    config=config,
+                    autype=AUTYPE.QFQ,
+                )
+
+                if len(chan_5m[0]) > 0:
+                    bsp_5m = chan_5m.get_latest_bsp(number=0)
+                    cutoff_5m = now - timedelta(days=3)
+                    if find_recent_buy_point(bsp_5m, cutoff_5m) is not None:
+                        resonance_count += 1
+                        resonance_levels.append("5分")
+            except Exception:
+                pass
+
+        # 计算最终风险评级
+        bonus = resonance_count - 1
+        final_rating = min(5, base_rating + bonus)
+        resonance_str = "+".join(resonance_levels)
+
+        return {
+            'status': 'found',
+            'code': code,
+            'name': name,
+            'price': price,
+            'change': change,
+            'bsp_type': f"{bsp_type}({resonance_str})" if resonance_count >= 2 else bsp_type,
+            'bsp_time': str(latest_buy.klu.time),
+            'risk_rating': final_rating,
+            'resonance_count': resonance_count,
+            'resonance_str': resonance_str,
+            'chan': chan_day if keep_chan else None,
+        }
+
+    except Exception as e:
+        return {'status': 'error', 'reason': str(e)[:50]}
 
 
 class BspScannerWindow(tk.Toplevel):
@@ -340,22 +922,32 @@ class BspScannerWindow(tk.Toplevel):
     """
 
     window_count = 0
-    instances: List['BspScannerWindow'] = []
+    instances: Set['BspScannerWindow'] = set()
+
+    # 勾选框可直接切换显示的叠加元素（MACD 会改变子图布局，仍需重画）
+    CHART_OVERLAYS = ("plot_kline", "plot_bi", "plot_seg", "plot_zs", "plot_bsp")
 
     def __init__(self, master=None):
         super().__init__(master)
 
         BspScannerWindow.window_count += 1
-        BspScannerWindow.instances.append(self)
+        BspScannerWindow.instances.add(self)
 
         self.chan: Optional[CChan] = None
         self.scan_thread: Optional[threading.Thread] = None
         self.analysis_thread: Optional[threading.Thread] = None
         self.stock_cache: Dict[str, CChan] = {}
-        self.stock_data: List[Dict] = []  # 存储完整的股票数据用于排序
+        self._chan_config_cache: Dict[bool, CChanConfig] = {}
+        self._worker_stop_event = None  # 计算进程共享的停止标志，每次扫描新建
+        self.stock_data: List[Dict] = []  # 扫描过程中按发现顺序累积的股票数据
+        self.stock_df: Optional[pd.DataFrame] = None  # 按列存储的股票数据，用于排序/显示/导出
+        self._display_rows: List[Tuple] = []  # 与 stock_data 对应的已格式化显示行
         self.is_scanning = False
         self.is_analyzing = False
-        self.scan_queue = queue.Queue()
+        # 后台线程 -> 界面的消息队列：deque 的 append/popleft 线程安全且无需加锁，
+        # Event 只用于通知轮询有新消息，缩短下一次轮询间隔
+        self.scan_queue = deque()
+        self._scan_msg_event = threading.Event()
 
         # 排序状态
         self.sort_column = None
@@ -610,22 +1202,28 @@ class BspScannerWindow(tk.Toplevel):
         ttk.Label(plot_options, text="显示:").pack(side=tk.LEFT)
 
         self.plot_kline_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(plot_options, text="K线", variable=self.plot_kline_var).pack(side=tk.LEFT, padx=2)
+        ttk.Checkbutton(plot_options, text="K线", variable=self.plot_kline_var,
+                        command=self._toggle_chart_overlays).pack(side=tk.LEFT, padx=2)
 
         self.plot_bi_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(plot_options, text="笔", variable=self.plot_bi_var).pack(side=tk.LEFT, padx=2)
+        ttk.Checkbutton(plot_options, text="笔", variable=self.plot_bi_var,
+                        command=self._toggle_chart_overlays).pack(side=tk.LEFT, padx=2)
 
         self.plot_seg_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(plot_options, text="线段", variable=self.plot_seg_var).pack(side=tk.LEFT, padx=2)
+        ttk.Checkbutton(plot_options, text="线段", variable=self.plot_seg_var,
+                        command=self._toggle_chart_overlays).pack(side=tk.LEFT, padx=2)
 
         self.plot_zs_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(plot_options, text="中枢", variable=self.plot_zs_var).pack(side=tk.LEFT, padx=2)
+        ttk.Checkbutton(plot_options, text="中枢", variable=self.plot_zs_var,
+                        command=self._toggle_chart_overlays).pack(side=tk.LEFT, padx=2)
 
         self.plot_bsp_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(plot_options, text="买卖点", variable=self.plot_bsp_var).pack(side=tk.LEFT, padx=2)
+        ttk.Checkbutton(plot_options, text="买卖点", variable=self.plot_bsp_var,
+                        command=self._toggle_chart_overlays).pack(side=tk.LEFT, padx=2)
 
         self.plot_macd_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(plot_options, text="MACD", variable=self.plot_macd_var).pack(side=tk.LEFT, padx=2)
+        ttk.Checkbutton(plot_options, text="MACD", variable=self.plot_macd_var,
+                        command=self.plot_chart).pack(side=tk.LEFT, padx=2)
 
         ttk.Button(plot_options, text="刷新图表", command=self.refresh_chart).pack(side=tk.LEFT, padx=(10, 0))
 
@@ -638,6 +1236,9 @@ class BspScannerWindow(tk.Toplevel):
 
         # matplotlib 画布
         self.fig = Figure(figsize=(12, 8), dpi=100)
+        # 已绘制图表的 artist 缓存: plot_config 键 -> artist 列表
+        self._chart_artists: Dict[str, list] = {}
+        self._chart_key = None
         self.canvas = FigureCanvasTkAgg(self.fig, master=chart_tab)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
@@ -664,39 +1265,46 @@ class BspScannerWindow(tk.Toplevel):
             self.sort_reverse = False
 
         # 根据列类型选择排序键
-        if column == 'price':
-            self.stock_data.sort(key=lambda x: x['price'], reverse=self.sort_reverse)
-        elif column == 'change':
-            self.stock_data.sort(key=lambda x: x['change'], reverse=self.sort_reverse)
-        elif column == 'risk':
-            self.stock_data.sort(key=lambda x: x['risk_rating'], reverse=self.sort_reverse)
-        elif column == 'resonance':
-            self.stock_data.sort(key=lambda x: x['resonance_count'], reverse=self.sort_reverse)
-        elif column == 'code':
-            self.stock_data.sort(key=lambda x: x['code'], reverse=self.sort_reverse)
-        elif column == 'name':
-            self.stock_data.sort(key=lambda x: x['name'], reverse=self.sort_reverse)
+        key_field = {
+            'price': 'price',
+            'change': 'change',
+            'risk': 'risk_rating',
+            'resonance': 'resonance_count',
+            'code': 'code',
+            'name': 'name',
+        }.get(column)
+        if key_field is None:
+            return
+
+        # 按列排序，索引即显示行位置，显示行无需重新格式化
+        self._sync_stock_df()
+        self.stock_df.sort_values(key_field, ascending=not self.sort_reverse, kind='stable', inplace=True)
 
         # 刷新表格
         self._refresh_stock_tree()
 
+    def _sync_stock_df(self):
+        """扫描中新增了股票时重建 stock_df，已有行保持当前排序，新增行排在最后（与表格显示一致）"""
+        if self.stock_df is None or len(self.stock_df) != len(self.stock_data):
+            order = [] if self.stock_df is None else list(self.stock_df.index)
+            order += range(len(order), len(self.stock_data))
+            self.stock_df = build_stock_df(self.stock_data).loc[order]
+        if len(self._display_rows) != len(self.stock_data):
+            self._display_rows = format_stock_rows(self.stock_data)
+
     def _refresh_stock_tree(self):
-        """刷新股票列表显示"""
-        for item in self.stock_tree.get_children():
-            self.stock_tree.delete(item)
-
-        for data in self.stock_data:
-            # 共振显示：有共振显示级别，无共振显示"-"
-            resonance_display = data.get('resonance_str', '-') if data.get('resonance_count', 1) >= 2 else '-'
-            self.stock_tree.insert('', tk.END, values=(
-                data['code'],
-                data['name'],
-                f"{data['price']:.2f}",
-                f"{data['change']:+.2f}%",
-                get_risk_stars(data['risk_rating']),
-                resonance_display,
-                data['bsp_type'].split('(')[0]  # 只显示买点类型，不含共振信息
-            ))
+        """刷新股票列表显示（行 iid 为该行在 stock_data 中的位置）"""
+        self._sync_stock_df()
+        order = [str(i) for i in self.stock_df.index]
+
+        children = self.stock_tree.get_children()
+        if len(children) == len(order) and set(children) == set(order):
+            # 所有行都已在表格中，排序只需一次性调整行顺序
+            self.stock_tree.set_children('', *order)
+            return
+
+        clear_tree(self.stock_tree)
+        bulk_insert_rows(self.stock_tree, ((iid, self._display_rows[int(iid)], ()) for iid in order))
 
     def export_to_txt(self):
         """导出股票列表到TXT文件"""
@@ -713,6 +1321,8 @@ class BspScannerWindow(tk.Toplevel):
         if not filename:
             return
 
+        self._sync_stock_df()
+
         try:
             with open(filename, 'w', encoding='utf-8') as f:
                 f.write("=" * 70 + "\n")
@@ -722,13 +1332,16 @@ class BspScannerWindow(tk.Toplevel):
                 f.write(f"{'代码':<10}{'名称':<12}{'现价':<10}{'涨跌%':<10}{'风险系数':<12}{'买点类型'}\n")
                 f.write("-" * 70 + "\n")
 
-                for data in self.stock_data:
-                    f.write(f"{data['code']:<10}"
-                           f"{data['name']:<12}"
-                           f"{data['price']:<10.2f}"
-                           f"{data['change']:+.2f}%".ljust(10) +
-                           f"{get_risk_stars(data['risk_rating']):<12}"
-                           f"{data['bsp_type']}\n")
+                # 按列拼接整段文本，一次写入
+                columns = ['code', 'name', 'price', 'change', 'risk_rating', 'bsp_type']
+                df = self.stock_df
+                lines = (df['code'].str.ljust(10) +
+                         df['name'].str.ljust(12) +
+                         df['price'].map('{:.2f}'.format).str.ljust(10) +
+                         df['change'].map('{:+.2f}%'.format).str.ljust(10) +
+                         df['risk_rating'].map(_RISK_STARS.__getitem__).str.ljust(12) +
+                         df['bsp_type'])
+                f.write("\n".join(lines) + "\n")
 
                 f.write("\n" + "-" * 70 + "\n")
                 f.write(f"共 {len(self.stock_data)} 只股票\n")
@@ -738,6 +1351,11 @@ class BspScannerWindow(tk.Toplevel):
                 f.write("★★★☆☆ (3星) - 一般\n")
                 f.write("★★☆☆☆ (2星) - 风险较高\n")
 
+                # 机器可读数据段，导入回测时直接整段读取
+                f.write(f"\n{BACKTEST_DATA_BEGIN}\n")
+                self.stock_df[columns].to_csv(f, sep='\t', index=False, float_format='%.2f', lineterminator='\n')
+                f.write(f"{BACKTEST_DATA_END}\n")
+
             self.status_var.set(f'已导出到: {filename}')
             messagebox.showinfo("导出成功", f"已导出 {len(self.stock_data)} 只股票到:\n{filename}")
 
@@ -774,61 +1392,44 @@ class BspScannerWindow(tk.Toplevel):
         Returns:
             List[Dict]: [{'code': '000001', 'name': '平安银行', 'rec_price': 10.5, 'rec_date': '2024-01-01'}, ...]
         """
-        stocks = []
-        rec_date = None
-
         with open(filename, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+            lines = [line.strip() for line in f]
 
-        in_data_section = False
+        # 解析推荐日期（从标题行提取）
+        # 格式: A股买点扫描结果 - 2024-01-01 10:30:00
+        rec_date = None
         for line in lines:
-            line = line.strip()
-
-            # 解析推荐日期（从标题行提取）
             if "A股买点扫描结果" in line and "-" in line:
-                # 格式: A股买点扫描结果 - 2024-01-01 10:30:00
-                try:
-                    date_part = line.split("-", 1)[1].strip()
-                    # 提取日期部分 (YYYY-MM-DD)
-                    rec_date = date_part.split()[0]
-                except:
-                    pass
-
-            # 检测数据开始（表头后的分隔线）
-            if line.startswith("-" * 10) and not in_data_section:
-                in_data_section = True
-                continue
-
-            # 检测数据结束
-            if in_data_section and (line.startswith("-" * 10) or line.startswith("共 ")):
+                parts = line.split("-", 1)[1].split()
+                rec_date = parts[0] if parts else None
                 break
 
-            # 解析数据行
-            if in_data_section and line:
-                parts = line.split()
-                if len(parts) >= 3:
-                    try:
-                        code = parts[0]
-                        # 验证是否为有效股票代码（6位数字）
-                        if len(code) == 6 and code.isdigit():
-                            name = parts[1]
-                            # 价格可能在第3列
-                            price_str = parts[2]
-                            try:
-                                price = float(price_str)
-                            except ValueError:
-                                continue
-
-                            stocks.append({
-                                'code': code,
-                                'name': name,
-                                'rec_price': price,
-                                'rec_date': rec_date or '未知'
-                            })
-                    except:
-                        continue
-
-        return stocks
+        if BACKTEST_DATA_BEGIN in lines:
+            # 新版导出文件：整段读取 TSV 数据
+            start = lines.index(BACKTEST_DATA_BEGIN) + 1
+            end = lines.index(BACKTEST_DATA_END, start) if BACKTEST_DATA_END in lines[start:] else len(lines)
+            df = pd.read_csv(io.StringIO("\n".join(lines[start:end])), sep='\t', dtype=str)
+        else:
+            # 旧版导出文件：表头后的分隔线与下一条分隔线/合计行之间为数据，按空白拆出前三列
+            start = next((i + 1 for i, line in enumerate(lines) if line.startswith("-" * 10)), len(lines))
+            end = next((i for i in range(start, len(lines))
+                        if lines[i].startswith("-" * 10) or lines[i].startswith("共 ")), len(lines))
+            rows = pd.Series([line for line in lines[start:end] if line], dtype=object)
+            df = rows.str.split(n=3, expand=True)
+            if df.shape[1] < 3:
+                return []
+            df = df.iloc[:, :3].set_axis(['code', 'name', 'price'], axis=1)
+
+        # 验证是否为有效股票代码（6位数字）以及价格是否为数字
+        price = pd.to_numeric(df['price'], errors='coerce')
+        valid = df['code'].str.match(r'^\d{6}$', na=False) & price.notna()
+
+        return pd.DataFrame({
+            'code': df.loc[valid, 'code'],
+            'name': df.loc[valid, 'name'],
+            'rec_price': price[valid],
+            'rec_date': rec_date or '未知',
+        }).to_dict('records')
 
     def _show_backtest_window(self, stocks: List[Dict], filename: str):
         """显示回测结果窗口"""
@@ -913,6 +1514,7 @@ class BspScannerWindow(tk.Toplevel):
         btn_frame.pack(fill=tk.X, pady=(10, 0))
 
         ttk.Button(btn_frame, text="导出回测报告", command=lambda: self._export_backtest_report(stocks, filename)).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="刷新价格", command=lambda: self._refresh_backtest_prices(stocks)).pack(side=tk.LEFT, padx=(10, 0))
         ttk.Button(btn_frame, text="关闭", command=backtest_win.destroy).pack(side=tk.RIGHT)
 
         # 保存窗口和数据引用
@@ -922,43 +1524,27 @@ class BspScannerWindow(tk.Toplevel):
         # 在后台线程获取当前价格
         threading.Thread(target=self._fetch_current_prices, args=(stocks,), daemon=True).start()
 
-    def _fetch_current_prices(self, stocks: List[Dict]):
-        """后台获取股票当前价格"""
+    def _refresh_backtest_prices(self, stocks: List[Dict]):
+        """重新获取当前价格并刷新回测结果（手动刷新，不使用行情缓存）"""
+        self.backtest_status_var.set("正在获取最新价格...")
+        threading.Thread(target=self._fetch_current_prices, args=(stocks, 0), daemon=True).start()
+
+    def _fetch_current_prices(self, stocks: List[Dict], max_age: float = SPOT_CACHE_TTL):
+        """后台获取股票当前价格，max_age 秒内的行情缓存可直接使用"""
         try:
-            # 获取实时行情
-            df = ak.stock_zh_a_spot_em()
-
-            results = []
-            for stock in stocks:
-                code = stock['code']
-                name = stock['name']
-                rec_price = stock['rec_price']
-
-                # 查找当前价格
-                match = df[df['代码'] == code]
-                if not match.empty:
-                    cur_price = float(match.iloc[0]['最新价'])
-                    change = cur_price - rec_price
-                    change_pct = (change / rec_price) * 100 if rec_price > 0 else 0
-
-                    results.append({
-                        'code': code,
-                        'name': name,
-                        'rec_price': rec_price,
-                        'cur_price': cur_price,
-                        'change': change,
-                        'change_pct': change_pct
-                    })
-                else:
-                    # 找不到数据，标记为无效
-                    results.append({
-                        'code': code,
-                        'name': name,
-                        'rec_price': rec_price,
-                        'cur_price': None,
-                        'change': None,
-                        'change_pct': None
-                    })
+            # 获取实时行情（一次请求），按代码哈希表逐只查询当前价格
+            prices = get_spot_prices(max_age=max_age)
+
+            joined = pd.DataFrame(stocks, columns=['code', 'name', 'rec_price']).set_index('code')
+            joined['cur_price'] = np.fromiter((prices.get(code, np.nan) for code in joined.index),
+                                              dtype=np.float64, count=len(joined))
+            joined['change'] = joined['cur_price'] - joined['rec_price']
+            joined['change_pct'] = (joined['change'] / joined['rec_price'] * 100).where(joined['rec_price'] > 0, 0.0)
+            # 找不到数据（或停牌无价格）标记为无效
+            joined.loc[joined['cur_price'].isna(), ['change', 'change_pct']] = np.nan
+
+            joined = joined.reset_index().astype(object)
+            results = joined.where(joined.notna(), None).to_dict('records')
 
             # 在主线程更新UI
             self.after(0, lambda: self._update_backtest_results(results))
@@ -971,21 +1557,17 @@ class BspScannerWindow(tk.Toplevel):
         if not hasattr(self, 'backtest_tree') or not self.backtest_tree.winfo_exists():
             return
 
-        # 清空表格
-        for item in self.backtest_tree.get_children():
-            self.backtest_tree.delete(item)
-
-        # 统计数据
-        valid_results = [r for r in results if r['cur_price'] is not None]
-        winners = [r for r in valid_results if r['change_pct'] > 0]
-        losers = [r for r in valid_results if r['change_pct'] < 0]
-        flat = [r for r in valid_results if r['change_pct'] == 0]
-
-        # 按涨跌幅排序（从高到低）
-        results.sort(key=lambda x: x['change_pct'] if x['change_pct'] is not None else -999, reverse=True)
+        # 按涨跌幅排序（从高到低，无数据的排最后），只在这里排序一次，导出报告直接复用
+        sort_keys = np.fromiter((-999 if r['change_pct'] is None else r['change_pct'] for r in results),
+                                dtype=np.float64, count=len(results))
+        order = np.argsort(-sort_keys, kind='stable')
+        results = [results[i] for i in order]
+        # 行 iid 为该股票在导入列表中的位置，刷新价格时据此原地更新
+        iids = [str(i) for i in order]
 
         # 填充表格
-        for r in results:
+        rows = []
+        for iid, r in zip(iids, results):
             if r['cur_price'] is None:
                 values = (r['code'], r['name'], f"{r['rec_price']:.2f}", "无数据", "-", "-")
                 tag = 'flat'
@@ -1007,25 +1589,33 @@ class BspScannerWindow(tk.Toplevel):
                     f"{r['change_pct']:+.2f}%"
                 )
 
-            self.backtest_tree.insert('', tk.END, values=values, tags=(tag,))
+            rows.append((iid, values, (tag,)))
+
+        children = self.backtest_tree.get_children()
+        if len(children) == len(iids) and set(children) == set(iids):
+            # 同一批股票再次刷新：原地修改各行并调整顺序，不删除重建
+            for iid, values, tags in rows:
+                self.backtest_tree.item(iid, values=values, tags=tags)
+            self.backtest_tree.set_children('', *iids)
+        else:
+            clear_tree(self.backtest_tree)
+            bulk_insert_rows(self.backtest_tree, rows)
 
         # 计算统计数据
-        if valid_results:
-            avg_return = sum(r['change_pct'] for r in valid_results) / len(valid_results)
-            win_rate = len(winners) / len(valid_results) * 100
-            max_gain = max(r['change_pct'] for r in valid_results)
-            max_loss = min(r['change_pct'] for r in valid_results)
+        stats = compute_backtest_stats(results)
+        if stats['valid']:
+            avg_return = stats['avg_return']
 
             # 更新统计标签
             avg_color = "red" if avg_return > 0 else ("green" if avg_return < 0 else "black")
             self.stats_labels['avg_return'].config(text=f"{avg_return:+.2f}%", foreground=avg_color)
-            self.stats_labels['win_rate'].config(text=f"{win_rate:.1f}%")
-            self.stats_labels['max_gain'].config(text=f"{max_gain:+.2f}%", foreground="red")
-            self.stats_labels['max_loss'].config(text=f"{max_loss:+.2f}%", foreground="green")
-            self.stats_labels['winners'].config(text=f"{len(winners)}只", foreground="red")
-            self.stats_labels['losers'].config(text=f"{len(losers)}只", foreground="green")
+            self.stats_labels['win_rate'].config(text=f"{stats['win_rate']:.1f}%")
+            self.stats_labels['max_gain'].config(text=f"{stats['max_gain']:+.2f}%", foreground="red")
+            self.stats_labels['max_loss'].config(text=f"{stats['max_loss']:+.2f}%", foreground="green")
+            self.stats_labels['winners'].config(text=f"{stats['winners']}只", foreground="red")
+            self.stats_labels['losers'].config(text=f"{stats['losers']}只", foreground="green")
 
-        self.backtest_status_var.set(f"回测完成 - 有效数据{len(valid_results)}只")
+        self.backtest_status_var.set(f"回测完成 - 有效数据{stats['valid']}只")
         self.backtest_results = results  # 保存结果用于导出
 
     def _on_backtest_error(self, error_msg: str):
@@ -1041,7 +1631,8 @@ class BspScannerWindow(tk.Toplevel):
 
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")],
+            filetypes=[("Text Files", "*.txt"), ("Parquet", "*.parquet"), ("Feather", "*.feather"),
+                       ("All Files", "*.*")],
             initialfile=f"回测报告_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         )
 
@@ -1050,114 +1641,156 @@ class BspScannerWindow(tk.Toplevel):
 
         try:
             results = self.backtest_results
-            valid_results = [r for r in results if r['cur_price'] is not None]
-            winners = [r for r in valid_results if r['change_pct'] > 0]
-            losers = [r for r in valid_results if r['change_pct'] < 0]
 
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("=" * 80 + "\n")
-                f.write(f"策略回测报告 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 80 + "\n\n")
-
-                # 原始文件信息
-                rec_date = stocks[0]['rec_date'] if stocks else '未知'
-                f.write(f"原始推荐文件: {original_filename}\n")
-                f.write(f"推荐日期: {rec_date}\n")
-                f.write(f"回测日期: {datetime.now().strftime('%Y-%m-%d')}\n\n")
-
-                # 统计摘要
-                f.write("-" * 80 + "\n")
-                f.write("【策略统计摘要】\n")
-                f.write("-" * 80 + "\n")
-
-                if valid_results:
-                    avg_return = sum(r['change_pct'] for r in valid_results) / len(valid_results)
-                    win_rate = len(winners) / len(valid_results) * 100
-                    max_gain = max(r['change_pct'] for r in valid_results)
-                    max_loss = min(r['change_pct'] for r in valid_results)
-
-                    f.write(f"  股票总数: {len(stocks)}只\n")
-                    f.write(f"  有效数据: {len(valid_results)}只\n")
-                    f.write(f"  平均收益: {avg_return:+.2f}%\n")
-                    f.write(f"  胜率:     {win_rate:.1f}%\n")
-                    f.write(f"  盈利股票: {len(winners)}只\n")
-                    f.write(f"  亏损股票: {len(losers)}只\n")
-                    f.write(f"  最大涨幅: {max_gain:+.2f}%\n")
-                    f.write(f"  最大跌幅: {max_loss:+.2f}%\n")
-
-                f.write("\n")
-                f.write("-" * 80 + "\n")
-                f.write("【详细数据】\n")
-                f.write("-" * 80 + "\n")
-                f.write(f"{'代码':<10}{'名称':<12}{'推荐价':<10}{'当前价':<10}{'涨跌额':<10}{'涨跌幅':<10}\n")
-                f.write("-" * 80 + "\n")
-
-                # 按涨跌幅排序
-                results.sort(key=lambda x: x['change_pct'] if x['change_pct'] is not None else -999, reverse=True)
-
-                for r in results:
-                    if r['cur_price'] is None:
-                        f.write(f"{r['code']:<10}{r['name']:<12}{r['rec_price']:<10.2f}{'无数据':<10}{'-':<10}{'-':<10}\n")
-                    else:
-                        f.write(f"{r['code']:<10}{r['name']:<12}{r['rec_price']:<10.2f}{r['cur_price']:<10.2f}{r['change']:+.2f}".ljust(60) + f"{r['change_pct']:+.2f}%\n")
+            # 列式格式保存原始数据，便于后续批量读取分析（需要 pyarrow）
+            suffix = Path(filename).suffix.lower()
+            if suffix in ('.parquet', '.feather'):
+                df = pd.DataFrame(results, columns=['code', 'name', 'rec_price', 'cur_price', 'change', 'change_pct'])
+                num_cols = ['rec_price', 'cur_price', 'change', 'change_pct']
+                df[num_cols] = df[num_cols].astype(np.float64)
+                df.insert(2, 'rec_date', stocks[0]['rec_date'] if stocks else '')
+                if suffix == '.parquet':
+                    df.to_parquet(filename, compression='zstd', index=False)
+                else:
+                    df.to_feather(filename)
+                messagebox.showinfo("导出成功", f"回测数据已导出到:\n{filename}")
+                return
 
-                f.write("\n" + "=" * 80 + "\n")
-                f.write("注: 正值表示盈利，负值表示亏损\n")
+            stats = compute_backtest_stats(results)
+
+            # 整份报告先写入内存缓冲，最后一次写盘
+            buf = io.StringIO()
+            buf.write("=" * 80 + "\n")
+            buf.write(f"策略回测报告 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            buf.write("=" * 80 + "\n\n")
+
+            # 原始文件信息
+            rec_date = stocks[0]['rec_date'] if stocks else '未知'
+            buf.write(f"原始推荐文件: {original_filename}\n")
+            buf.write(f"推荐日期: {rec_date}\n")
+            buf.write(f"回测日期: {datetime.now().strftime('%Y-%m-%d')}\n\n")
+
+            # 统计摘要
+            buf.write("-" * 80 + "\n")
+            buf.write("【策略统计摘要】\n")
+            buf.write("-" * 80 + "\n")
+
+            if stats['valid']:
+                buf.write(f"  股票总数: {len(stocks)}只\n")
+                buf.write(f"  有效数据: {stats['valid']}只\n")
+                buf.write(f"  平均收益: {stats['avg_return']:+.2f}%\n")
+                buf.write(f"  胜率:     {stats['win_rate']:.1f}%\n")
+                buf.write(f"  盈利股票: {stats['winners']}只\n")
+                buf.write(f"  亏损股票: {stats['losers']}只\n")
+                buf.write(f"  最大涨幅: {stats['max_gain']:+.2f}%\n")
+                buf.write(f"  最大跌幅: {stats['max_loss']:+.2f}%\n")
+
+            buf.write("\n")
+            buf.write("-" * 80 + "\n")
+            buf.write("【详细数据】\n")
+            buf.write("-" * 80 + "\n")
+            buf.write(f"{'代码':<10}{'名称':<12}{'推荐价':<10}{'当前价':<10}{'涨跌额':<10}{'涨跌幅':<10}\n")
+            buf.write("-" * 80 + "\n")
+
+            # backtest_results 已按涨跌幅排好序
+            buf.writelines([format_backtest_line(r) for r in results])
+
+            buf.write("\n" + "=" * 80 + "\n")
+            buf.write("注: 正值表示盈利，负值表示亏损\n")
+
+            with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write(buf.getvalue())
 
             messagebox.showinfo("导出成功", f"回测报告已导出到:\n{filename}")
 
         except Exception as e:
             messagebox.showerror("导出失败", str(e))
 
+    def _post_scan_msg(self, msg_type: str, data: dict):
+        """后台线程向界面发送消息"""
+        self.scan_queue.append((msg_type, data))
+        self._scan_msg_event.set()
+
     def _poll_scan_queue(self):
         """轮询扫描结果队列"""
+        self._scan_msg_event.clear()
+        # 本轮收到的买点股票、日志攒齐后一次写入界面，进度只保留最新一条
+        found_batch = []
+        log_batch = []
+        last_progress = None
+        applied = False
+
+        def flush():
+            nonlocal found_batch, log_batch, last_progress
+            self._add_stocks_to_list(found_batch)
+            self._append_logs(log_batch)
+            if last_progress is not None:
+                self.progress_var.set(last_progress['value'])
+                self.progress_label.config(text=last_progress['text'])
+            found_batch, log_batch, last_progress = [], [], None
+
         try:
-            # 每次最多处理50条消息，避免阻塞UI
-            for _ in range(50):
+            # 每轮至少处理50条，积压时处理一半积压量，避免队列越积越多
+            for _ in range(max(50, len(self.scan_queue) // 2)):
                 try:
-                    msg_type, data = self.scan_queue.get_nowait()
-                    if msg_type == 'log':
-                        self._append_log(data['text'], data.get('tag', 'info'))
-                    elif msg_type == 'progress':
-                        self.progress_var.set(data['value'])
-                        self.progress_label.config(text=data['text'])
-                    elif msg_type == 'found':
-                        self._add_stock_to_list(data)
-                    elif msg_type == 'finished':
-                        self._on_scan_finished(data['success'], data['fail'], data['found'])
-                    elif msg_type == 'analysis_done':
-                        self._on_analysis_done(data['chan'], data['code'])
-                    elif msg_type == 'analysis_error':
-                        self._on_analysis_error(data['error'])
-                except queue.Empty:
+                    msg_type, data = self.scan_queue.popleft()
+                except IndexError:
                     break
-            # 强制更新UI
-            self.update_idletasks()
+                applied = True
+                if msg_type == 'found':
+                    found_batch.append(data)
+                    continue
+                if msg_type == 'log':
+                    log_batch.append((data['text'], data.get('tag', 'info')))
+                    continue
+                if msg_type == 'progress':
+                    last_progress = data
+                    continue
+                # 其他消息可能依赖已有行（如扫描完成后同步表格数据），先落地已攒的内容
+                flush()
+                if msg_type == 'finished':
+                    self._on_scan_finished(data['success'], data['fail'], data['found'])
+                elif msg_type == 'analysis_done':
+                    self._on_analysis_done(data['chan'], data['code'])
+                elif msg_type == 'analysis_error':
+                    self._on_analysis_error(data['error'])
+            flush()
+            # 本轮确有消息落地时才强制刷新界面，空轮询不触发整棵控件树的空闲任务
+            if applied:
+                self.update_idletasks()
         except Exception:
             pass
-        self.after(50, self._poll_scan_queue)  # 加快轮询频率
+        # 有新消息时快速轮询，空闲时放慢
+        busy = bool(self.scan_queue) or self._scan_msg_event.is_set()
+        self.after(50 if busy else 200, self._poll_scan_queue)
 
     def _append_log(self, text: str, tag: str = "info"):
         """追加日志"""
-        self.log_text.insert(tk.END, f"{text}\n", tag)
+        self._append_logs([(text, tag)])
+
+    def _append_logs(self, entries: List[Tuple[str, str]]):
+        """批量追加日志：相邻同标签的行合并成一段，所有段交替传给一次 Text.insert"""
+        if not entries:
+            return
+        args = []
+        lines = []
+        current_tag = entries[0][1]
+        for text, tag in entries:
+            if tag != current_tag:
+                args += ["".join(lines), current_tag]
+                lines = []
+                current_tag = tag
+            lines.append(f"{text}\n")
+        args += ["".join(lines), current_tag]
+        self.log_text.insert(tk.END, *args)
         self.log_text.see(tk.END)
 
     def get_chan_config(self) -> CChanConfig:
-        """获取技术分析配置"""
-        return CChanConfig({
-            "bi_strict": self.bi_strict_var.get(),
-            "trigger_step": False,
-            "skip_step": 0,
-            "divergence_rate": float("inf"),
-            "bsp2_follow_1": False,
-            "bsp3_follow_1": False,
-            "min_zs_cnt": 0,
-            "bs1_peak": False,
-            "macd_algo": "peak",
-            "bs_type": "1,1p,2,2s,3a,3b",
-            "print_warning": False,
-            "zs_algo": "normal",
-        })
+        """获取技术分析配置（唯一可变参数是笔严格模式，按该开关缓存）"""
+        bi_strict = self.bi_strict_var.get()
+        if bi_strict not in self._chan_config_cache:
+            self._chan_config_cache[bi_strict] = CChanConfig(scanner_chan_conf(bi_strict))
+        return self._chan_config_cache[bi_strict]
 
     def get_plot_config(self) -> dict:
         """获取图表绑定配置"""
@@ -1187,11 +1820,12 @@ class BspScannerWindow(tk.Toplevel):
         self.scan_btn.config(text="停止扫描")
         self.stock_cache.clear()
         self.stock_data.clear()
+        self.stock_df = None
+        self._display_rows.clear()
         self.progress_var.set(0)
 
         # 清空表格
-        for item in self.stock_tree.get_children():
-            self.stock_tree.delete(item)
+        clear_tree(self.stock_tree)
 
         self.status_var.set('正在获取股票列表...')
         self.update()
@@ -1210,7 +1844,7 @@ class BspScannerWindow(tk.Toplevel):
             'include_gem': self.include_gem_var.get(),
             'include_star': self.include_star_var.get(),
             'include_bse': self.include_bse_var.get(),
-            'config': self.get_chan_config(),
+            'chan_conf': scanner_chan_conf(self.bi_strict_var.get()),
         }
 
         self.scan_thread = threading.Thread(target=self._scan_thread, args=(scan_params,), daemon=True)
@@ -1219,134 +1853,27 @@ class BspScannerWindow(tk.Toplevel):
     def stop_scan(self):
         """停止扫描"""
         self.is_scanning = False
+        if self._worker_stop_event is not None:
+            self._worker_stop_event.set()
         self.scan_btn.config(text="开始扫描")
         self.status_var.set('扫描已停止')
 
-    def _analyze_single_stock(self, code: str, name: str, price: float, change: float,
-                               bsp_days: int, history_days: int, use_nesting: bool,
-                               config: CChanConfig) -> Optional[Dict]:
+    def _fetch_stock_klines(self, code: str, begin_time: str, end_time: str):
         """
-        分析单只股票（用于并行处理）
-        返回: 买点信息字典 或 None（无买点/失败）
+        预取单只股票的日线数据（纯网络IO，在IO线程池中执行）
+        之后 analyze_stock_bsp 构造 CChan 时直接使用下载结果，不再发起请求
         """
         if not self.is_scanning:
             return None
 
-        try:
-            begin_time = (datetime.now() - timedelta(days=history_days)).strftime("%Y-%m-%d")
-            end_time = datetime.now().strftime("%Y-%m-%d")
-
-            # 日线分析
-            chan_day = CChan(
-                code=code,
-                begin_time=begin_time,
-                end_time=end_time,
-                data_src=DATA_SRC.AKSHARE,
-                lv_list=[KL_TYPE.K_DAY],
-                config=config,
-                autype=AUTYPE.QFQ,
-            )
-
-            # 检查数据有效性
-            if len(chan_day[0]) == 0:
-                return {'status': 'skip', 'reason': '无K线数据'}
-
-            # 检查日线买点
-            bsp_list = chan_day.get_latest_bsp(number=0)
-            cutoff_date = datetime.now() - timedelta(days=bsp_days)
-            day_buy_points = [
-                bsp for bsp in bsp_list
-                if bsp.is_buy and datetime(bsp.klu.time.year, bsp.klu.time.month, bsp.klu.time.day) >= cutoff_date
-            ]
-
-            if not day_buy_points:
-                return {'status': 'skip', 'reason': '无近期买点'}
-
-            latest_buy = day_buy_points[0]
-            bsp_type = latest_buy.type2str()
-            base_rating = get_bsp_risk_rating(bsp_type)
-            resonance_count = 1
-            resonance_levels = ["日线"]
-
-            # 区间套共振检查
-            if use_nesting:
-                # 30分钟级别
-                try:
-                    min30_days = max(history_days // 10, 30)
-                    min30_begin = (datetime.now() - timedelta(days=min30_days)).strftime("%Y-%m-%d")
-
-                    chan_30m = CChan(
-                        code=code,
-                        begin_time=min30_begin,
-                        end_time=end_time,
-                        data_src=DATA_SRC.AKSHARE,
-                        lv_list=[KL_TYPE.K_30M],
-                        config=config,
-                        autype=AUTYPE.QFQ,
-                    )
-
-                    if len(chan_30m[0]) > 0:
-                        bsp_30m = chan_30m.get_latest_bsp(number=0)
-                        cutoff_30m = datetime.now() - timedelta(days=5)
-                        buy_30m = [
-                            bsp for bsp in bsp_30m
-                            if bsp.is_buy and datetime(bsp.klu.time.year, bsp.klu.time.month, bsp.klu.time.day) >= cutoff_30m
-                        ]
-                        if buy_30m:
-                            resonance_count += 1
-                            resonance_levels.append("30分")
-                except Exception:
-                    pass
-
-                # 5分钟级别
-                try:
-                    min5_days = min(5, max(history_days // 30, 3))
-                    min5_begin = (datetime.now() - timedelta(days=min5_days)).strftime("%Y-%m-%d")
-
-                    chan_5m = CChan(
-                        code=code,
-                        begin_time=min5_begin,
-                        end_time=end_time,
-                        data_src=DATA_SRC.AKSHARE,
-                        lv_list=[KL_TYPE.K_5M],
-                        config=config,
-                        autype=AUTYPE.QFQ,
-                    )
-
-                    if len(chan_5m[0]) > 0:
-                        bsp_5m = chan_5m.get_latest_bsp(number=0)
-                        cutoff_5m = datetime.now() - timedelta(days=3)
-                        buy_5m = [
-                            bsp for bsp in bsp_5m
-                            if bsp.is_buy and datetime(bsp.klu.time.year, bsp.klu.time.month, bsp.klu.time.day) >= cutoff_5m
-                        ]
-                        if buy_5m:
-                            resonance_count += 1
-                            resonance_levels.append("5分")
-                except Exception:
-                    pass
-
-            # 计算最终风险评级
-            bonus = resonance_count - 1
-            final_rating = min(5, base_rating + bonus)
-            resonance_str = "+".join(resonance_levels)
-
-            return {
-                'status': 'found',
-                'code': code,
-                'name': name,
-                'price': price,
-                'change': change,
-                'bsp_type': f"{bsp_type}({resonance_str})" if resonance_count >= 2 else bsp_type,
-                'bsp_time': str(latest_buy.klu.time),
-                'risk_rating': final_rating,
-                'resonance_count': resonance_count,
-                'resonance_str': resonance_str,
-                'chan': chan_day,
-            }
-
-        except Exception as e:
-            return {'status': 'error', 'reason': str(e)[:50]}
+        # 优先使用本地缓存，只下载缓存之后的部分
+        cached, fetch_begin = _kline_cache.lookup(code, begin_time)
+        fresh = CAkshare(code, KL_TYPE.K_DAY, fetch_begin, end_time, AUTYPE.QFQ).fetch_kl_df()
+        df = _kline_cache.merge(code, cached, fresh, begin_time, end_time)
+        if df is None:
+            fresh = CAkshare(code, KL_TYPE.K_DAY, begin_time, end_time, AUTYPE.QFQ).fetch_kl_df()
+            df = _kline_cache.merge(code, None, fresh, begin_time, end_time)
+        return df
 
     def _scan_thread(self, params: dict):
         """扫描线程（使用线程池并行处理）
@@ -1357,7 +1884,7 @@ class BspScannerWindow(tk.Toplevel):
         try:
             # 检查是否已取消
             if not self.is_scanning:
-                self.scan_queue.put(('finished', {'success': 0, 'fail': 0, 'found': 0}))
+                self._post_scan_msg('finished', {'success': 0, 'fail': 0, 'found': 0})
                 return
 
             # 使用预先获取的参数（避免在后台线程访问 tkinter 变量）
@@ -1369,7 +1896,7 @@ class BspScannerWindow(tk.Toplevel):
             max_cap = params['max_cap']
             use_nesting = params['use_nesting']
             max_workers = params['max_workers']
-            config = params['config']
+            chan_conf = params['chan_conf']
 
             # 获取股票列表
             stock_list = get_tradable_stocks(
@@ -1385,52 +1912,117 @@ class BspScannerWindow(tk.Toplevel):
 
             # 获取列表后再次检查是否已取消
             if not self.is_scanning:
-                self.scan_queue.put(('log', {'text': '扫描已取消', 'tag': 'warning'}))
-                self.scan_queue.put(('finished', {'success': 0, 'fail': 0, 'found': 0}))
+                self._post_scan_msg('log', {'text': '扫描已取消', 'tag': 'warning'})
+                self._post_scan_msg('finished', {'success': 0, 'fail': 0, 'found': 0})
                 return
 
             if stock_list.empty:
-                self.scan_queue.put(('log', {'text': '获取股票列表失败或无符合条件的股票', 'tag': 'error'}))
-                self.scan_queue.put(('finished', {'success': 0, 'fail': 0, 'found': 0}))
+                self._post_scan_msg('log', {'text': '获取股票列表失败或无符合条件的股票', 'tag': 'error'})
+                self._post_scan_msg('finished', {'success': 0, 'fail': 0, 'found': 0})
                 return
 
             total = len(stock_list)
             nesting_str = "日线+30分+5分" if use_nesting else "仅日线"
-            self.scan_queue.put(('log', {'text': f'获取到 {total} 只可交易股票，使用 {max_workers} 线程并行扫描...', 'tag': 'info'}))
-            self.scan_queue.put(('log', {'text': f'筛选参数: 近{bsp_days}天买点, {history_days}天K线, 价格{min_price}-{max_price}元, 市值{min_cap}-{max_cap}亿, {nesting_str}', 'tag': 'info'}))
+            self._post_scan_msg('log', {'text': f'获取到 {total} 只可交易股票，使用 {max_workers} 路并行扫描...', 'tag': 'info'})
+            self._post_scan_msg('log', {'text': f'筛选参数: 近{bsp_days}天买点, {history_days}天K线, 价格{min_price}-{max_price}元, 市值{min_cap}-{max_cap}亿, {nesting_str}', 'tag': 'info'})
 
             success_count = 0
             fail_count = 0
             found_count = 0
             completed = 0
 
-            # 使用线程池并行处理
-            executor = ThreadPoolExecutor(max_workers=max_workers)
+            # 网络IO与缠论计算分开：
+            # IO线程池下载K线（等待网络时不占GIL，可以开大），计算进程池运行CChan（绕开GIL，不超过CPU核数）
+            # 安装了 httpx 时用异步连接池下载，否则使用IO线程池
+            io_pool = ThreadPoolExecutor(max_workers=max_workers * 3)
+            async_fetcher = AsyncKlineFetcher() if httpx is not None else None
+            # 整轮扫描共用同一个基准时间，下载区间与子进程中的分析区间保持一致
+            scan_time = datetime.now()
+            begin_time = (scan_time - timedelta(days=history_days)).strftime("%Y-%m-%d")
+            end_time = scan_time.strftime("%Y-%m-%d")
+            cutoff_date = scan_time - timedelta(days=bsp_days)
+            # 每个计算进程启动时构造一次 CChanConfig，任务参数中不再携带配置
+            # 停止标志跨进程共享，停止扫描后子进程中正在进行的分析也能提前结束
+            mp_context = multiprocessing.get_context('spawn')
+            self._worker_stop_event = mp_context.Event()
+            cpu_pool = ProcessPoolExecutor(max_workers=min(max_workers, os.cpu_count() or 1),
+                                           mp_context=mp_context,
+                                           initializer=_init_scan_worker,
+                                           initargs=(chan_conf, self._worker_stop_event))
+            done_queue = queue.Queue()
+
+            def _on_fetched(io_future, code, name, price, change):
+                # K线下载完成后把计算任务交给计算池，下载失败则直接作为结果返回
+                if io_future.cancelled() or not self.is_scanning:
+                    return
+                if io_future.exception() is not None:
+                    done_queue.put((code, name, io_future))
+                    return
+                kline_df = io_future.result()
+                # 预检不通过的股票不进入计算池，省去进程间传输和 CChan 计算
+                # （预检出错时交给计算池，由 analyze_stock_bsp 报告错误）
+                try:
+                    skip_reason = precheck_klines(kline_df, cutoff_date) if kline_df is not None else None
+                except Exception:
+                    skip_reason = None
+                if skip_reason is not None:
+                    skip_future = Future()
+                    skip_future.set_result({'status': 'skip', 'reason': skip_reason})
+                    done_queue.put((code, name, skip_future))
+                    return
+                try:
+                    # 只把K线数据传给子进程，结果中不带回 CChan 对象
+                    cpu_future = cpu_pool.submit(
+                        analyze_stock_bsp,
+                        code, name, price, change,
+                        bsp_days, history_days, use_nesting, None,
+                        kline_df, False, scan_time
+                    )
+                except RuntimeError as e:
+                    if not self.is_scanning:
+                        # 计算池已关闭（扫描已停止）
+                        return
+                    # 计算池不可用（如子进程异常退出导致 BrokenProcessPool），作为失败结果返回，保证进度能走完
+                    error_future = Future()
+                    error_future.set_exception(e)
+                    done_queue.put((code, name, error_future))
+                    return
+                cpu_future.add_done_callback(lambda f: done_queue.put((code, name, f)))
+
             try:
                 # 提交所有任务
-                future_to_stock = {}
-                for idx, row in stock_list.iterrows():
+                io_futures = []
+                # 按列取出后逐行 zip，避免 iterrows 为每行构造 Series
+                for code, name, price, change in zip(stock_list['代码'].to_numpy(),
+                                                     stock_list['名称'].to_numpy(),
+                                                     stock_list['最新价'].to_numpy(dtype=np.float64),
+                                                     stock_list['涨跌幅'].to_numpy(dtype=np.float64)):
                     if not self.is_scanning:
                         break
-                    future = executor.submit(
-                        self._analyze_single_stock,
-                        row['代码'], row['名称'], row['最新价'], row['涨跌幅'],
-                        bsp_days, history_days, use_nesting, config
+                    if async_fetcher is not None:
+                        future = async_fetcher.submit(code, begin_time, end_time)
+                    else:
+                        future = io_pool.submit(self._fetch_stock_klines, code, begin_time, end_time)
+                    future.add_done_callback(
+                        lambda f, c=code, n=name, p=float(price), ch=float(change): _on_fetched(f, c, n, p, ch)
                     )
-                    future_to_stock[future] = (row['代码'], row['名称'])
+                    io_futures.append(future)
 
                 # 处理完成的任务
-                for future in as_completed(future_to_stock):
+                while completed < len(io_futures):
                     if not self.is_scanning:
                         # 取消剩余任务
-                        for f in future_to_stock:
+                        for f in io_futures:
                             f.cancel()
                         break
 
-                    code, name = future_to_stock[future]
+                    try:
+                        code, name, future = done_queue.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
                     completed += 1
                     progress = completed / total * 100
-                    self.scan_queue.put(('progress', {'value': progress, 'text': f'{completed}/{total}'}))
+                    self._post_scan_msg('progress', {'value': progress, 'text': f'{completed}/{total}'})
 
                     try:
                         result = future.result()
@@ -1443,11 +2035,11 @@ class BspScannerWindow(tk.Toplevel):
                             risk_str = get_risk_stars(result['risk_rating'])
 
                             if result['resonance_count'] >= 2:
-                                self.scan_queue.put(('log', {'text': f'🎯 {code} {name}: {result["resonance_str"]}共振! {result["bsp_type"].split("(")[0]} {risk_str}', 'tag': 'success'}))
+                                self._post_scan_msg('log', {'text': f'🎯 {code} {name}: {result["resonance_str"]}共振! {result["bsp_type"].split("(")[0]} {risk_str}', 'tag': 'success'})
                             else:
-                                self.scan_queue.put(('log', {'text': f'✅ {code} {name}: 发现买点 {result["bsp_type"]} {risk_str}', 'tag': 'success'}))
+                                self._post_scan_msg('log', {'text': f'✅ {code} {name}: 发现买点 {result["bsp_type"]} {risk_str}', 'tag': 'success'})
 
-                            self.scan_queue.put(('found', result))
+                            self._post_scan_msg('found', result)
 
                         elif result['status'] == 'skip':
                             success_count += 1
@@ -1455,61 +2047,62 @@ class BspScannerWindow(tk.Toplevel):
 
                         elif result['status'] == 'error':
                             fail_count += 1
-                            self.scan_queue.put(('log', {'text': f'❌ {code} {name}: {result["reason"]}', 'tag': 'error'}))
+                            self._post_scan_msg('log', {'text': f'❌ {code} {name}: {result["reason"]}', 'tag': 'error'})
 
                     except Exception as e:
                         fail_count += 1
-                        self.scan_queue.put(('log', {'text': f'❌ {code} {name}: {str(e)[:50]}', 'tag': 'error'}))
+                        self._post_scan_msg('log', {'text': f'❌ {code} {name}: {str(e)[:50]}', 'tag': 'error'})
 
             finally:
                 # 确保线程池被正确关闭
                 # cancel_futures 参数在 Python 3.9+ 可用
-                try:
-                    executor.shutdown(wait=False, cancel_futures=True)
-                except TypeError:
-                    # Python 3.8 及以下版本
-                    executor.shutdown(wait=False)
+                for executor in (io_pool, cpu_pool):
+                    try:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                    except TypeError:
+                        # Python 3.8 及以下版本
+                        executor.shutdown(wait=False)
+                if async_fetcher is not None:
+                    async_fetcher.close()
 
             # 在发送完成消息前，先清理局部变量中可能包含的对象引用
             # 避免线程结束时垃圾回收触发 tkinter 错误
-            future_to_stock.clear()
+            io_futures.clear()
             stock_list = None
             gc.collect()
 
-            self.scan_queue.put(('finished', {'success': success_count, 'fail': fail_count, 'found': found_count}))
+            self._post_scan_msg('finished', {'success': success_count, 'fail': fail_count, 'found': found_count})
 
         except Exception as e:
-            self.scan_queue.put(('log', {'text': f'扫描出错: {e}', 'tag': 'error'}))
-            self.scan_queue.put(('finished', {'success': 0, 'fail': 0, 'found': 0}))
+            self._post_scan_msg('log', {'text': f'扫描出错: {e}', 'tag': 'error'})
+            self._post_scan_msg('finished', {'success': 0, 'fail': 0, 'found': 0})
         finally:
             # 确保线程结束前进行垃圾回收
             gc.collect()
 
-    def _add_stock_to_list(self, data: dict):
-        """添加股票到列表"""
+    def _add_stocks_to_list(self, data_list: List[dict]):
+        """批量添加一次轮询中收到的股票到列表"""
+        if not data_list:
+            return
         # 保存数据用于排序
-        self.stock_data.append(data)
-
-        # 共振显示：有共振显示级别，无共振显示"-"
-        resonance_display = data.get('resonance_str', '-') if data.get('resonance_count', 1) >= 2 else '-'
+        start = len(self.stock_data)
+        self.stock_data.extend(data_list)
+        rows = format_stock_rows(data_list)
+        self._display_rows.extend(rows)
 
         # 添加到表格
-        self.stock_tree.insert('', tk.END, values=(
-            data['code'],
-            data['name'],
-            f"{data['price']:.2f}",
-            f"{data['change']:+.2f}%",
-            get_risk_stars(data['risk_rating']),
-            resonance_display,
-            data['bsp_type'].split('(')[0]  # 只显示买点类型，不含共振信息
-        ))
-
-        # 缓存 chan 对象
-        self.stock_cache[data['code']] = data['chan']
+        bulk_insert_rows(self.stock_tree,
+                         ((str(start + i), row, ()) for i, row in enumerate(rows)))
+
+        # 缓存 chan 对象（子进程计算的结果不带 chan，选中时再单独分析）
+        for data in data_list:
+            if data.get('chan') is not None:
+                self.stock_cache[data['code']] = data['chan']
 
     def _on_scan_finished(self, success: int, fail: int, found: int):
         """扫描完成"""
         self.is_scanning = False
+        self._sync_stock_df()
         self.scan_btn.config(text="开始扫描")
         self.progress_label.config(text=f"完成: 成功{success}, 跳过{fail}, 买点{found}")
         self.status_var.set(f'扫描完成: 成功{success}只, 跳过{fail}只, 发现{found}只买点股票')
@@ -1579,13 +2172,15 @@ class BspScannerWindow(tk.Toplevel):
                 config=self.get_chan_config(),
                 autype=AUTYPE.QFQ,
             )
-            self.scan_queue.put(('analysis_done', {'chan': chan, 'code': code}))
+            self._post_scan_msg('analysis_done', {'chan': chan, 'code': code})
         except Exception as e:
-            self.scan_queue.put(('analysis_error', {'error': str(e)}))
+            self._post_scan_msg('analysis_error', {'error': str(e)})
 
     def _on_analysis_done(self, chan: CChan, code: str):
         """分析完成"""
         self.chan = chan
+        # 扫描结果跨进程返回时不带 CChan，点击后按需分析的结果在此缓存，再次点击直接复用
+        self.stock_cache[code] = chan
         self.is_analyzing = False
         self.analyze_btn.config(state=tk.NORMAL)
         self.plot_chart()
@@ -1598,51 +2193,87 @@ class BspScannerWindow(tk.Toplevel):
         messagebox.showerror("分析错误", error)
         self.status_var.set('分析失败')
 
-    def plot_chart(self):
-        """绑制图表"""
+    def plot_chart(self, force: bool = False):
+        """绑制图表
+
+        同一个 chan、画布尺寸和 MACD 开关下只构建一次 artist，
+        之后切换勾选框仅调用 set_visible 并 draw_idle。
+        """
         if not self.chan:
             return
 
+        canvas_widget = self.canvas.get_tk_widget()
+        canvas_width = canvas_widget.winfo_width()
+        canvas_height = canvas_widget.winfo_height()
+        plot_macd = self.plot_macd_var.get()
+
+        chart_key = (id(self.chan), canvas_width, canvas_height, plot_macd)
+        if not force and chart_key == self._chart_key and self._chart_artists:
+            self._toggle_chart_overlays()
+            return
+
         try:
             from Plot.PlotDriver import CPlotDriver
 
-            plt.close('all')
-
+            # 可切换的元素全部画出，再按勾选状态设置可见性
             plot_config = self.get_plot_config()
+            plot_config.update({name: True for name in self.CHART_OVERLAYS})
 
-            canvas_widget = self.canvas.get_tk_widget()
-            canvas_width = canvas_widget.winfo_width()
-            canvas_height = canvas_widget.winfo_height()
             dpi = 100
             fig_width = max(canvas_width / dpi, 10)
 
-            if plot_config.get("plot_macd", False):
+            if plot_macd:
                 macd_h_ratio = 0.3
                 fig_height = max(canvas_height / dpi / (1 + macd_h_ratio), 5)
             else:
                 fig_height = max(canvas_height / dpi, 6)
 
+            # 复用画布上的同一个 Figure，只清空重画子图
             plot_para = {
                 "figure": {
                     "x_range": 200,
                     "w": fig_width,
                     "h": fig_height,
+                    "fig": self.fig,
                 }
             }
 
             plot_driver = CPlotDriver(self.chan, plot_config=plot_config, plot_para=plot_para)
 
-            self.fig = plot_driver.figure
-            self.canvas.figure = self.fig
-            self.canvas.draw()
+            self._chart_artists = {}
+            for groups in plot_driver.artist_groups.values():
+                for name, artists in groups.items():
+                    self._chart_artists.setdefault(name, []).extend(artists)
+            self._chart_key = chart_key
+
+            self._apply_overlay_visibility()
+            self.canvas.draw_idle()
             self.toolbar.update()
 
         except Exception as e:
+            self._chart_artists = {}
+            self._chart_key = None
             messagebox.showerror("绑图错误", str(e))
 
+    def _apply_overlay_visibility(self):
+        """按勾选状态设置各叠加元素的可见性"""
+        plot_config = self.get_plot_config()
+        for name in self.CHART_OVERLAYS:
+            visible = plot_config[name]
+            for artist in self._chart_artists.get(name, ()):
+                artist.set_visible(visible)
+
+    def _toggle_chart_overlays(self):
+        """勾选框切换：复用已有 artist，只改可见性"""
+        if not self._chart_artists:
+            self.plot_chart()
+            return
+        self._apply_overlay_visibility()
+        self.canvas.draw_idle()
+
     def refresh_chart(self):
         """刷新图表"""
-        self.plot_chart()
+        self.plot_chart(force=True)
 
     def get_selected_stock_code(self) -> str:
         """获取当前选中的股票代码（BaoStock格式）"""
@@ -1723,14 +2354,15 @@ class BspScannerWindow(tk.Toplevel):
 
     def clear_stock_list(self):
         """清空股票列表"""
-        for item in self.stock_tree.get_children():
-            self.stock_tree.delete(item)
+        clear_tree(self.stock_tree)
         self.stock_cache.clear()
         self.stock_data.clear()
+        self.stock_df = None
+        self._display_rows.clear()
         self.status_var.set('列表已清空')
 
-    def on_close(self):
-        """窗口关闭"""
+    def shutdown(self):
+        """释放窗口资源（停止扫描/分析、清理缓存、移出实例列表），不销毁窗口"""
         if self.is_scanning:
             self.stop_scan()
             # 等待扫描线程结束
@@ -1745,12 +2377,17 @@ class BspScannerWindow(tk.Toplevel):
         # 清理缓存，避免持有大量对象
         self.stock_cache.clear()
         self.stock_data.clear()
+        self.stock_df = None
+        self._display_rows.clear()
 
         # 强制垃圾回收
         gc.collect()
 
-        if self in BspScannerWindow.instances:
-            BspScannerWindow.instances.remove(self)
+        BspScannerWindow.instances.discard(self)
+
+    def on_close(self):
+        """窗口关闭"""
+        self.shutdown()
 
         if len(BspScannerWindow.instances) == 0:
             if isinstance(self.master, BspScannerApp):
@@ -1772,6 +2409,8 @@ class BspScannerApp(tk.Tk):
 
 def main():
     """程序入口"""
+    # 扫描使用进程池，打包为 exe 后需要
+    multiprocessing.freeze_support()
     print("启动A股买点扫描器...")
     app = BspScannerApp()
     app.run()
@@ -13,6 +13,10 @@ Powered by chan.py
 """
 import sys
 import os
+import functools
+import importlib
+import threading
+import traceback
 from pathlib import Path
 
 # PyInstaller 打包兼容：设置正确的模块搜索路径
@@ -44,6 +48,12 @@ import tkinter as tk
 from tkinter import ttk
 
 
+@functools.lru_cache(maxsize=None)
+def _resolve(module_name: str, attr: str):
+    """解析子窗口类，首次导入后缓存（导入失败不缓存，下次点击会重试）"""
+    return getattr(importlib.import_module(module_name), attr)
+
+
 class ChanApp(tk.Tk):
     """缠论分析器主应用"""
 
@@ -63,17 +73,17 @@ class ChanApp(tk.Tk):
         self.geometry(f"{width}x{height}+{x}+{y}")
 
         # 跟踪打开的窗口
-        self.single_level_windows = []
-        self.multi_level_windows = []
-        self.scanner_windows = []
+        self.single_level_windows = set()
+        self.multi_level_windows = set()
+        self.scanner_windows = set()
 
         self.init_ui()
 
         # 主窗口关闭时退出程序
         self.protocol("WM_DELETE_WINDOW", self._on_main_close)
 
-        # 预加载股票列表
-        self.after(100, self._preload_stock_list)
+        # 预加载股票列表（后台线程加载，无需再延迟到首次绘制之后）
+        self._preload_stock_list()
 
     def init_ui(self):
         """初始化界面"""
@@ -163,101 +173,58 @@ class ChanApp(tk.Tk):
         ).pack(fill=tk.X)
 
     def _preload_stock_list(self):
-        """预加载股票列表"""
+        """预加载股票列表（后台线程解析 CSV，不阻塞主窗口首次绘制）"""
         self.status_var.set("正在加载股票列表...")
-        self.update()
+        threading.Thread(target=self._bg_load_stocks, daemon=True).start()
 
+    def _bg_load_stocks(self):
+        """后台线程：加载股票列表，结果通过 after 回到主线程更新状态栏"""
         try:
+            # 结果缓存在 chan_viewer_tk 模块内，之后打开的单级别窗口直接复用
             from chan_viewer_tk import load_stock_list
             stock_list = load_stock_list()
-            self.status_var.set(f"就绪 - 已加载 {len(stock_list)} 只股票")
+            msg = f"就绪 - 已加载 {len(stock_list)} 只股票"
         except Exception as e:
-            self.status_var.set(f"加载股票列表失败: {e}")
+            msg = f"加载股票列表失败: {e}"
+        self.after(0, lambda: self.status_var.set(msg))
 
     def open_single_level(self):
         """打开单级别分析窗口"""
-        try:
-            from chan_viewer_tk import ChanViewerWindow
-
-            # 创建窗口，父窗口设为 self
-            window = ChanViewerWindow(self)
-
-            # 修改窗口关闭行为
-            window.protocol("WM_DELETE_WINDOW", lambda w=window: self._on_child_close(w, self.single_level_windows))
-
-            self.single_level_windows.append(window)
-            self.status_var.set(f"已打开单级别分析窗口 (共 {len(self.single_level_windows)} 个)")
-
-        except Exception as e:
-            self.status_var.set(f"打开失败: {e}")
-            import traceback
-            traceback.print_exc()
+        self._open_window('chan_viewer_tk', 'ChanViewerWindow', self.single_level_windows, "单级别分析窗口")
 
     def open_multi_level(self):
         """打开多级别分析窗口"""
-        try:
-            from chan_viewer_multilevel_tk import MultiLevelViewerWindow
-
-            # 创建窗口，父窗口设为 self
-            window = MultiLevelViewerWindow(self)
-
-            # 修改窗口关闭行为
-            window.protocol("WM_DELETE_WINDOW", lambda w=window: self._on_child_close(w, self.multi_level_windows))
-
-            self.multi_level_windows.append(window)
-            self.status_var.set(f"已打开多级别分析窗口 (共 {len(self.multi_level_windows)} 个)")
-
-        except Exception as e:
-            self.status_var.set(f"打开失败: {e}")
-            import traceback
-            traceback.print_exc()
+        self._open_window('chan_viewer_multilevel_tk', 'MultiLevelViewerWindow', self.multi_level_windows, "多级别分析窗口")
 
     def open_bsp_scanner(self):
         """打开买点扫描器窗口"""
+        self._open_window('ashare_bsp_scanner_tk', 'BspScannerWindow', self.scanner_windows, "买点扫描器窗口")
+
+    def _open_window(self, module_name: str, class_name: str, window_set: set, label: str):
+        """导入并创建子窗口，统一处理关闭行为和打开失败"""
         try:
-            from ashare_bsp_scanner_tk import BspScannerWindow
+            window_cls = _resolve(module_name, class_name)
 
             # 创建窗口，父窗口设为 self
-            window = BspScannerWindow(self)
+            window = window_cls(self)
 
             # 修改窗口关闭行为
-            window.protocol("WM_DELETE_WINDOW", lambda w=window: self._on_child_close(w, self.scanner_windows))
+            window.protocol("WM_DELETE_WINDOW", lambda w=window: self._on_child_close(w, window_set))
 
-            self.scanner_windows.append(window)
-            self.status_var.set(f"已打开买点扫描器窗口 (共 {len(self.scanner_windows)} 个)")
+            window_set.add(window)
+            self.status_var.set(f"已打开{label} (共 {len(window_set)} 个)")
 
         except Exception as e:
             self.status_var.set(f"打开失败: {e}")
-            import traceback
             traceback.print_exc()
 
-    def _on_child_close(self, window, window_list):
+    def _on_child_close(self, window, window_set):
         """处理子窗口关闭"""
-        # 调用窗口自身的关闭逻辑（清理资源）
-        if hasattr(window, 'on_close'):
-            # 临时修改 on_close 行为，避免调用 quit()
-            original_on_close = window.on_close
-
-            def safe_close():
-                # 停止分析
-                if hasattr(window, 'is_analyzing') and window.is_analyzing:
-                    window.stop_analysis()
-
-                # 取消自动刷新
-                if hasattr(window, 'auto_refresh_job') and window.auto_refresh_job:
-                    window.after_cancel(window.auto_refresh_job)
-
-                # 从类实例列表中移除
-                if hasattr(window, '__class__'):
-                    cls = window.__class__
-                    if hasattr(cls, 'instances') and window in cls.instances:
-                        cls.instances.remove(window)
-
-            safe_close()
+        # 由窗口自身清理资源（停止分析/扫描、取消自动刷新等），不触发独立运行时的退出逻辑
+        window.shutdown()
 
-        # 从本地列表移除
-        if window in window_list:
-            window_list.remove(window)
+        # 从本地集合移除
+        window_set.discard(window)
 
         # 销毁窗口
         window.destroy()
@@ -272,11 +239,11 @@ class ChanApp(tk.Tk):
     def _on_main_close(self):
         """主窗口关闭时，关闭所有子窗口并退出"""
         # 关闭所有子窗口
-        for window in self.single_level_windows[:]:
+        for window in list(self.single_level_windows):
             self._on_child_close(window, self.single_level_windows)
-        for window in self.multi_level_windows[:]:
+        for window in list(self.multi_level_windows):
             self._on_child_close(window, self.multi_level_windows)
-        for window in self.scanner_windows[:]:
+        for window in list(self.scanner_windows):
             self._on_child_close(window, self.scanner_windows)
 
         # 退出程序
@@ -290,6 +257,9 @@ class ChanApp(tk.Tk):
 
 def main():
     """程序入口"""
+    # 买点扫描器使用 spawn 进程池，打包为 exe 后子进程需要在此处接管，否则会重新启动主界面
+    import multiprocessing
+    multiprocessing.freeze_support()
     print("启动缠论分析器...")
     app = ChanApp()
     app.run()
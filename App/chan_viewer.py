@@ -14,31 +14,37 @@
 使用方法:
     python App/chan_viewer.py
 """
+from __future__ import annotations
+
+import functools
 import sys
+import time
 from pathlib import Path
 
 # 将项目根目录加入路径
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Optional, Dict, List, Set
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QComboBox, QCheckBox, QGroupBox,
     QMessageBox, QStatusBar, QSpinBox, QSplitter, QFrame
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QAbstractListModel, QModelIndex
 from PyQt6.QtGui import QAction
 
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
-import matplotlib.pyplot as plt
 
-from Chan import CChan
-from ChanConfig import CChanConfig
 from Common.CEnum import AUTYPE, DATA_SRC, KL_TYPE
 
+# Chan/ChanConfig 只在分析时用到，在用到的函数中局部导入
+if TYPE_CHECKING:
+    from Chan import CChan
+    from ChanConfig import CChanConfig
+
 
 # K线周期映射
 KL_TYPE_MAP = {
@@ -51,6 +57,38 @@ KL_TYPE_MAP = {
     "5分钟": KL_TYPE.K_5M,
 }
 
+# 分钟线数据量大，限制最大获取天数
+_MAX_DAYS_BY_KL = {
+    KL_TYPE.K_5M: 60,
+    KL_TYPE.K_15M: 60,
+    KL_TYPE.K_30M: 120,
+    KL_TYPE.K_60M: 120,
+}
+
+# 缠论默认配置（全部为常量，构建结果可复用）
+_DEFAULT_CHAN_CFG = {
+    "bi_strict": True,
+    "trigger_step": False,
+    "divergence_rate": float("inf"),
+    "bsp2_follow_1": False,
+    "bsp3_follow_1": False,
+    "min_zs_cnt": 0,
+    "bs1_peak": False,
+    "macd_algo": "peak",
+    "bs_type": "1,1p,2,2s,3a,3b",
+    "print_warning": False,
+    "zs_algo": "normal",
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _build_default_config() -> CChanConfig:
+    """构建默认缠论配置，只构建一次，各窗口及每次刷新共用"""
+    from ChanConfig import CChanConfig
+    # CChanConfig 会消费传入的字典，传副本以保留常量
+    return CChanConfig(dict(_DEFAULT_CHAN_CFG))
+
+
 # 数据源映射
 DATA_SRC_MAP = {
     "BaoStock": DATA_SRC.BAO_STOCK,
@@ -70,6 +108,30 @@ PRESET_STOCKS = [
 ]
 
 
+class PresetStockModel(QAbstractListModel):
+    """
+    股票下拉框的只读列表模型
+
+    直接引用 (code, name) 列表，显示文本在 Qt 请求时才生成，不为每一行预先创建条目
+    """
+    def __init__(self, stocks: List[tuple], parent=None):
+        super().__init__(parent)
+        self._stocks = stocks
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._stocks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        code, name = self._stocks[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return f"{code} {name}"
+        if role == Qt.ItemDataRole.UserRole:
+            return code
+        return None
+
+
 class AnalysisThread(QThread):
     """
     股票分析后台线程
@@ -88,18 +150,14 @@ class AnalysisThread(QThread):
         self.days = days
 
     def run(self):
+        from Chan import CChan
+
         try:
             self.progress.emit(f"正在获取 {self.code} 数据...")
 
             # 计算时间范围
-            if self.kl_type in [KL_TYPE.K_5M, KL_TYPE.K_15M]:
-                days = min(self.days, 60)  # 分钟线数据量大，限制天数
-            elif self.kl_type in [KL_TYPE.K_30M, KL_TYPE.K_60M]:
-                days = min(self.days, 120)
-            else:
-                days = self.days
-
-            begin_time = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+            days = min(self.days, _MAX_DAYS_BY_KL.get(self.kl_type, self.days))
+            begin_time = (date.today() - timedelta(days=days)).isoformat()
 
             self.progress.emit(f"正在计算 {self.code} 缠论元素...")
 
@@ -133,11 +191,15 @@ class ChanPlotCanvas(FigureCanvas):
     """
     def __init__(self, parent=None, width=14, height=8):
         from matplotlib.figure import Figure
-        self.fig = Figure(figsize=(width, height), dpi=100)
-        super().__init__(self.fig)
+        super().__init__(Figure(figsize=(width, height), dpi=100))
         self.setParent(parent)
         self.setMinimumHeight(400)
 
+    @property
+    def fig(self):
+        """画布的 Figure（即 FigureCanvasBase.figure，不再单独保存一份引用）"""
+        return self.figure
+
     def clear(self):
         self.fig.clear()
         self.draw()
@@ -153,17 +215,22 @@ class ChanViewerWindow(QMainWindow):
     # 窗口计数器（用于新窗口定位）
     window_count = 0
     # 所有窗口实例（防止被垃圾回收）
-    instances: List['ChanViewerWindow'] = []
+    instances: Set['ChanViewerWindow'] = set()
+    # 所有窗口共用一个单次自动刷新定时器，总是对准最早到期的窗口
+    _refresh_timer: Optional[QTimer] = None
+    # 订阅自动刷新的窗口 -> (刷新间隔秒数, 下次刷新的 monotonic 时间)
+    _refresh_subscribers: Dict['ChanViewerWindow', tuple] = {}
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
         ChanViewerWindow.window_count += 1
-        ChanViewerWindow.instances.append(self)
+        ChanViewerWindow.instances.add(self)
 
         self.chan: Optional[CChan] = None
         self.analysis_thread: Optional[AnalysisThread] = None
-        self.auto_refresh_timer: Optional[QTimer] = None
+        # 上次成功绘图时的输入签名，自动刷新数据未变化时跳过重绘
+        self._last_plot_sig: Optional[tuple] = None
         self.stock_name = ""
 
         self.init_ui()
@@ -192,9 +259,12 @@ class ChanViewerWindow(QMainWindow):
         self.code_combo = QComboBox()
         self.code_combo.setEditable(True)
         self.code_combo.setMinimumWidth(150)
-        for code, name in PRESET_STOCKS:
-            self.code_combo.addItem(f"{code} {name}", code)
-        self.code_combo.setCurrentText("sz.002639 雪人股份")
+        self.code_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.code_combo.setModel(PresetStockModel(PRESET_STOCKS, self.code_combo))
+        self.code_combo.setCurrentIndex(self.code_combo.findText("sz.002639 雪人股份"))
+        # 代码只在输入/选择变化时解析一次，分析和刷新时直接读缓存
+        self.code_combo.currentTextChanged.connect(self._on_code_changed)
+        self._on_code_changed()
         control_layout.addWidget(self.code_combo)
 
         # K线周期
@@ -203,6 +273,8 @@ class ChanViewerWindow(QMainWindow):
         for name in KL_TYPE_MAP.keys():
             self.kl_type_combo.addItem(name)
         self.kl_type_combo.setCurrentText("日线")
+        self.kl_type_combo.currentTextChanged.connect(self._on_kl_type_changed)
+        self._on_kl_type_changed(self.kl_type_combo.currentText())
         control_layout.addWidget(self.kl_type_combo)
 
         # 数据源
@@ -376,33 +448,32 @@ class ChanViewerWindow(QMainWindow):
         sep.setFrameShadow(QFrame.Shadow.Sunken)
         return sep
 
-    def get_current_code(self) -> str:
-        """获取当前选择的股票代码"""
+    def _on_code_changed(self, *_):
+        """股票下拉框内容变化时解析并缓存股票代码"""
         text = self.code_combo.currentText().strip()
-        # 尝试从下拉框数据获取
-        data = self.code_combo.currentData()
+        # 文本与当前选中项一致时直接取下拉框数据，手动输入的文本则解析
+        index = self.code_combo.currentIndex()
+        data = self.code_combo.currentData() if index >= 0 and self.code_combo.itemText(index) == text else None
         if data:
-            return data
+            self._current_code = data
         # 否则解析输入文本
-        if ' ' in text:
-            return text.split()[0]
-        return text
+        elif ' ' in text:
+            self._current_code = text.split()[0]
+        else:
+            self._current_code = text
+
+    def _on_kl_type_changed(self, kl_type_name: str):
+        """周期变化时缓存周期名称和对应的 KL_TYPE"""
+        self._kl_type_name = kl_type_name
+        self._kl_type = KL_TYPE_MAP.get(kl_type_name, KL_TYPE.K_DAY)
+
+    def get_current_code(self) -> str:
+        """获取当前选择的股票代码"""
+        return self._current_code
 
     def get_chan_config(self) -> CChanConfig:
         """获取缠论配置"""
-        return CChanConfig({
-            "bi_strict": True,
-            "trigger_step": False,
-            "divergence_rate": float("inf"),
-            "bsp2_follow_1": False,
-            "bsp3_follow_1": False,
-            "min_zs_cnt": 0,
-            "bs1_peak": False,
-            "macd_algo": "peak",
-            "bs_type": "1,1p,2,2s,3a,3b",
-            "print_warning": False,
-            "zs_algo": "normal",
-        })
+        return _build_default_config()
 
     def get_plot_config(self) -> dict:
         """获取绑图配置"""
@@ -418,13 +489,17 @@ class ChanViewerWindow(QMainWindow):
 
     def start_analysis(self):
         """开始分析"""
+        # 上一次分析尚未结束（数据源较慢或自动刷新间隔较短）时跳过本次，每个窗口最多一个分析线程
+        if self.analysis_thread is not None and self.analysis_thread.isRunning():
+            return
+
         code = self.get_current_code()
         if not code:
             QMessageBox.warning(self, "警告", "请输入股票代码")
             return
 
-        kl_type_name = self.kl_type_combo.currentText()
-        kl_type = KL_TYPE_MAP.get(kl_type_name, KL_TYPE.K_DAY)
+        kl_type_name = self._kl_type_name
+        kl_type = self._kl_type
 
         data_src_name = self.data_src_combo.currentText()
         data_src = DATA_SRC_MAP.get(data_src_name, DATA_SRC.BAO_STOCK)
@@ -444,19 +519,30 @@ class ChanViewerWindow(QMainWindow):
         self.analysis_thread.progress.connect(lambda msg: self.statusBar.showMessage(msg))
         self.analysis_thread.start()
 
+    def _release_analysis_thread(self):
+        """回收已结束的分析线程"""
+        thread = self.analysis_thread
+        if thread is None:
+            return
+        self.analysis_thread = None
+        # 结果信号在 run() 返回前发出，等待线程真正退出后再交给 Qt 释放
+        thread.wait()
+        thread.deleteLater()
+
     def on_analysis_finished(self, chan: CChan, stock_name: str):
         """分析完成"""
+        self._release_analysis_thread()
         self.chan = chan
         self.stock_name = stock_name
         self.analyze_btn.setEnabled(True)
         self.analyze_btn.setText("📊 分析")
 
         # 更新窗口标题
-        kl_type_name = self.kl_type_combo.currentText()
-        self.setWindowTitle(f'{self.get_current_code()} - {kl_type_name} - 缠论查看器')
+        self.setWindowTitle(f'{self.get_current_code()} - {self._kl_type_name} - 缠论查看器')
 
-        # 绑制图表
-        self.plot_chart()
+        # 绑制图表（数据和绘图参数都没变时跳过，例如收盘后的自动刷新）
+        if self._plot_signature() != self._last_plot_sig:
+            self.plot_chart()
 
         # 统计信息
         kl_data = chan[0]
@@ -472,11 +558,30 @@ class ChanViewerWindow(QMainWindow):
 
     def on_analysis_error(self, error_msg: str):
         """分析出错"""
+        self._release_analysis_thread()
         self.analyze_btn.setEnabled(True)
         self.analyze_btn.setText("📊 分析")
         QMessageBox.critical(self, "分析错误", f"分析失败:\n{error_msg}")
         self.statusBar.showMessage('分析失败')
 
+    def _plot_signature(self) -> tuple:
+        """当前图表输入的签名：股票、周期、数据源、天数、K线数量、最后一根K线的时间和收盘价、绘图参数、画布宽度
+        （不同数据源的前复权历史不同，K线数量和最后一根相同时缠论结构也可能不同）"""
+        kl_list = self.chan[0]
+        last_klu = kl_list[-1][-1] if len(kl_list) else None
+        return (
+            self.get_current_code(),
+            self._kl_type_name,
+            self.data_src_combo.currentText(),
+            self.days_spin.value(),
+            len(kl_list),
+            last_klu.time.ts if last_klu else None,
+            last_klu.close if last_klu else None,
+            tuple(self.get_plot_config().items()),
+            self.x_range_spin.value(),
+            self.canvas.width(),
+        )
+
     def plot_chart(self):
         """绑制图表"""
         if not self.chan:
@@ -485,9 +590,6 @@ class ChanViewerWindow(QMainWindow):
         try:
             from Plot.PlotDriver import CPlotDriver
 
-            # 关闭旧的 figure
-            plt.close('all')
-
             plot_config = self.get_plot_config()
 
             # 计算图表尺寸
@@ -501,19 +603,20 @@ class ChanViewerWindow(QMainWindow):
                     "w": fig_width,
                     "h": fig_height,
                     "x_range": self.x_range_spin.value(),
+                    # 直接画到画布已有的 Figure 上，避免每次刷新新建 Figure 并重新绑定画布
+                    "fig": self.canvas.fig,
                 }
             }
 
-            plot_driver = CPlotDriver(
+            CPlotDriver(
                 self.chan,
                 plot_config=plot_config,
                 plot_para=plot_para
             )
 
-            self.canvas.fig = plot_driver.figure
-            self.canvas.figure = plot_driver.figure
             self.canvas.draw()
             self.toolbar.update()
+            self._last_plot_sig = self._plot_signature()
 
         except Exception as e:
             QMessageBox.critical(self, "绑图错误", str(e))
@@ -527,8 +630,8 @@ class ChanViewerWindow(QMainWindow):
         from PyQt6.QtWidgets import QFileDialog
 
         code = self.get_current_code().replace('.', '_')
-        kl_type = self.kl_type_combo.currentText()
-        default_name = f"{code}_{kl_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+        kl_type = self._kl_type_name
+        default_name = f"{code}_{kl_type}_{time.strftime('%Y%m%d_%H%M%S')}.png"
 
         filename, _ = QFileDialog.getSaveFileName(
             self, "保存图片", default_name, "PNG Files (*.png);;All Files (*)"
@@ -541,17 +644,50 @@ class ChanViewerWindow(QMainWindow):
     def toggle_auto_refresh(self, state):
         """切换自动刷新"""
         if state == Qt.CheckState.Checked.value:
-            interval = self.refresh_interval_spin.value() * 1000  # 转为毫秒
-            self.auto_refresh_timer = QTimer(self)
-            self.auto_refresh_timer.timeout.connect(self.start_analysis)
-            self.auto_refresh_timer.start(interval)
-            self.statusBar.showMessage(f'自动刷新已启用 (间隔: {self.refresh_interval_spin.value()}秒)')
+            interval = self.refresh_interval_spin.value()
+            self._subscribe_auto_refresh(interval)
+            self.statusBar.showMessage(f'自动刷新已启用 (间隔: {interval}秒)')
         else:
-            if self.auto_refresh_timer:
-                self.auto_refresh_timer.stop()
-                self.auto_refresh_timer = None
+            self._unsubscribe_auto_refresh()
             self.statusBar.showMessage('自动刷新已关闭')
 
+    def _subscribe_auto_refresh(self, interval: int):
+        """加入共享自动刷新定时器"""
+        cls = ChanViewerWindow
+        cls._refresh_subscribers[self] = (interval, time.monotonic() + interval)
+        cls._schedule_refresh_timer()
+
+    def _unsubscribe_auto_refresh(self):
+        """退出共享自动刷新定时器，无订阅窗口时停止定时器"""
+        cls = ChanViewerWindow
+        if cls._refresh_subscribers.pop(self, None) is not None:
+            cls._schedule_refresh_timer()
+
+    @classmethod
+    def _schedule_refresh_timer(cls):
+        """把共享的单次定时器对准最早到期的窗口（定时器只创建一次，之后反复重设）"""
+        if cls._refresh_timer is None:
+            cls._refresh_timer = QTimer()
+            cls._refresh_timer.setSingleShot(True)
+            cls._refresh_timer.timeout.connect(cls._on_refresh_tick)
+        if not cls._refresh_subscribers:
+            cls._refresh_timer.stop()
+            return
+        next_fire = min(next_fire for _, next_fire in cls._refresh_subscribers.values())
+        delay_ms = max(0, int((next_fire - time.monotonic()) * 1000))
+        cls._refresh_timer.start(delay_ms)
+
+    @classmethod
+    def _on_refresh_tick(cls):
+        """共享定时器回调：触发所有到期窗口的分析，再对准下一个到期时间"""
+        now = time.monotonic()
+        due = [w for w, (_, next_fire) in cls._refresh_subscribers.items() if next_fire <= now]
+        for window in due:
+            interval = cls._refresh_subscribers[window][0]
+            cls._refresh_subscribers[window] = (interval, now + interval)
+            window.start_analysis()
+        cls._schedule_refresh_timer()
+
     def open_new_window(self):
         """打开新窗口"""
         new_window = ChanViewerWindow()
@@ -560,12 +696,10 @@ class ChanViewerWindow(QMainWindow):
     def closeEvent(self, event):
         """窗口关闭事件"""
         # 停止自动刷新
-        if self.auto_refresh_timer:
-            self.auto_refresh_timer.stop()
+        self._unsubscribe_auto_refresh()
 
         # 从实例列表移除
-        if self in ChanViewerWindow.instances:
-            ChanViewerWindow.instances.remove(self)
+        ChanViewerWindow.instances.discard(self)
 
         event.accept()
 
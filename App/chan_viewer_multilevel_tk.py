@@ -15,15 +15,22 @@
 使用方法:
     python App/chan_viewer_multilevel_tk.py
 """
+from __future__ import annotations
+
 import sys
+import itertools
 import io
 import queue
+import time
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Tuple
+from typing import TYPE_CHECKING, Callable, Optional, List, Dict, Tuple, Set
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 
 # 将项目根目录加入路径（兼容 PyInstaller 打包）
 def _setup_path():
@@ -39,15 +46,18 @@ _setup_path()
 
 import matplotlib
 matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
-from Chan import CChan
-from ChanConfig import CChanConfig
 from Common.CEnum import AUTYPE, DATA_SRC, KL_TYPE
 from stock_history import get_stock_history
-from stock_realtime import get_stock_realtime_data, StockRealtimeData
+from stock_list import read_stock_csv, search_stocks, search_delay_ms
+from stock_realtime import get_stock_realtime_data, get_cached_realtime_data, StockRealtimeData
+
+# Chan/ChanConfig 只在分析时用到，在用到的方法中局部导入，窗口可以先显示出来
+if TYPE_CHECKING:
+    from Chan import CChan
+    from ChanConfig import CChanConfig
 
 
 # K线周期映射
@@ -62,6 +72,9 @@ KL_TYPE_MAP = {
     "1分钟": KL_TYPE.K_1M,
 }
 
+# 级别 -> 中文名称
+KL_TYPE_NAME_CN = {kl_type: name for name, kl_type in KL_TYPE_MAP.items()}
+
 # 级别顺序（从大到小）
 KL_TYPE_ORDER = [
     KL_TYPE.K_MON, KL_TYPE.K_WEEK, KL_TYPE.K_DAY,
@@ -69,8 +82,125 @@ KL_TYPE_ORDER = [
     KL_TYPE.K_5M, KL_TYPE.K_1M
 ]
 
+# 各级别的数据源及 K线根数 -> 需请求天数 的换算：分钟级别使用 AkShare，日/周/月线使用 BaoStock
+LEVEL_META: Dict[KL_TYPE, Tuple[DATA_SRC, Callable[[int], int]]] = {
+    # 1分钟K线：每天约240根，至少请求5天数据确保足够
+    KL_TYPE.K_1M: (DATA_SRC.AKSHARE, lambda periods: max(periods // 240 + 3, 5)),
+    KL_TYPE.K_5M: (DATA_SRC.AKSHARE, lambda periods: max(periods // 48 + 5, 5)),
+    KL_TYPE.K_15M: (DATA_SRC.AKSHARE, lambda periods: max(periods // 16 + 5, 8)),
+    KL_TYPE.K_30M: (DATA_SRC.AKSHARE, lambda periods: max(periods // 8 + 5, 10)),
+    KL_TYPE.K_60M: (DATA_SRC.AKSHARE, lambda periods: max(periods // 4 + 5, 15)),
+    KL_TYPE.K_DAY: (DATA_SRC.BAO_STOCK, lambda periods: periods),
+    KL_TYPE.K_WEEK: (DATA_SRC.BAO_STOCK, lambda periods: periods * 7),
+    KL_TYPE.K_MON: (DATA_SRC.BAO_STOCK, lambda periods: periods * 30),
+}
+
 # 分钟级别使用 AkShare
-AKSHARE_KL_TYPES = {KL_TYPE.K_1M, KL_TYPE.K_5M, KL_TYPE.K_15M, KL_TYPE.K_30M, KL_TYPE.K_60M}
+AKSHARE_KL_TYPES = {kl_type for kl_type, (data_src, _) in LEVEL_META.items() if data_src == DATA_SRC.AKSHARE}
+
+# 所有窗口共用的级别分析线程池：各级别耗时主要在网络下载，CChan 计算本身较快
+# （数千根K线约几十毫秒），而跨进程传回 CChan 的序列化开销与计算相当，因此不用进程池
+_analysis_pool = ThreadPoolExecutor(thread_name_prefix='chan-level')
+
+# BaoStock 使用全局单连接（CChan 结束时会登出），多级别/多窗口并发分析时需串行访问
+_BAOSTOCK_LOCK = threading.Lock()
+
+# 分析结果缓存：BaoStock（日/周/月线）数据收盘后才更新，盘中重复分析同一股票无需重新下载计算；
+# 分钟级别仅供自动刷新在当前K线周期内复用
+# {(code, kl_type, begin_time): (缓存时间, CChan)}，CChan 分析完成后只读，可在多次分析/多窗口间共用
+CHAN_CACHE_TTL = 30 * 60
+CHAN_CACHE_SIZE = 32
+_chan_cache: "OrderedDict[tuple, Tuple[float, CChan]]" = OrderedDict()
+_chan_cache_lock = threading.Lock()
+
+
+# 分钟级别一根K线的时长（秒），自动刷新时未走完一根K线的级别不重新获取
+BAR_INTERVAL_SECONDS = {
+    KL_TYPE.K_1M: 60,
+    KL_TYPE.K_5M: 5 * 60,
+    KL_TYPE.K_15M: 15 * 60,
+    KL_TYPE.K_30M: 30 * 60,
+    KL_TYPE.K_60M: 60 * 60,
+}
+
+
+# AkShare 分钟数据接口偶发超时/返回空表，下载失败时的重试次数与间隔（秒）
+AKSHARE_FETCH_RETRIES = 2
+AKSHARE_RETRY_DELAY = 1.0
+
+
+def _prefetch_akshare(code: str, kl_type: KL_TYPE, begin_time: str):
+    """下载 AkShare K线并登记为预取数据，供随后相同参数的 CChan 使用；
+    重试后仍失败时不抛出，由 CChan 自行下载并报告错误"""
+    from DataAPI.AkshareAPI import CAkshare
+    for attempt in range(AKSHARE_FETCH_RETRIES + 1):
+        try:
+            if not CAkshare.prefetch(code, kl_type, begin_time, None, AUTYPE.QFQ).empty:
+                return
+        except Exception:
+            pass
+        if attempt < AKSHARE_FETCH_RETRIES:
+            time.sleep(AKSHARE_RETRY_DELAY)
+
+
+def _visible_tail(items: list, x_begin: float) -> list:
+    """items（笔/线段绘图元数据）按位置递增排列，返回 end_x >= x_begin 的尾部；从后往前找，只访问可见部分"""
+    i = len(items)
+    while i > 0 and items[i - 1].end_x >= x_begin:
+        i -= 1
+    return items[i:]
+
+
+def _put_collection(artists: dict, key: str, ax, cls, data: list, **props):
+    """放置 key 对应的 collection：artists 中已有时原地替换顶点/线段和样式，否则新建并加入 ax（data 为空时不新建）"""
+    coll = artists.get(key)
+    if coll is None:
+        if data:
+            coll = cls(data, **props)
+            ax.add_collection(coll, autolim=False)
+            artists[key] = coll
+        return
+    coll.set_verts(data)  # LineCollection.set_verts 即 set_segments
+    if data:
+        coll.set(**props)
+
+
+# 自动刷新时上一次分析仍在进行，间隔多久再尝试（毫秒）
+AUTO_REFRESH_RETRY_MS = 5000
+
+
+def _chan_cache_ttl(kl_type: KL_TYPE, auto_refresh: bool) -> float:
+    """级别结果可复用的时长：BaoStock 级别固定 CHAN_CACHE_TTL；
+    分钟级别手动分析时总是重新获取，自动刷新时在一根K线周期内复用"""
+    if kl_type not in AKSHARE_KL_TYPES:
+        return CHAN_CACHE_TTL
+    return BAR_INTERVAL_SECONDS[kl_type] if auto_refresh else 0
+
+
+def _get_cached_chan(key: tuple, ttl: float = CHAN_CACHE_TTL) -> Optional[CChan]:
+    """取 ttl 秒内的缓存结果"""
+    with _chan_cache_lock:
+        entry = _chan_cache.get(key)
+        if entry is None:
+            return None
+        age = time.time() - entry[0]
+        if age > ttl:
+            # 超过最长有效期的直接淘汰；分钟级别的旧结果留给后续 LRU 淘汰
+            if age > CHAN_CACHE_TTL:
+                del _chan_cache[key]
+            return None
+        _chan_cache.move_to_end(key)
+        return entry[1]
+
+
+def _put_cached_chan(key: tuple, chan: CChan):
+    """写入缓存，超出容量时淘汰最久未使用的结果"""
+    with _chan_cache_lock:
+        _chan_cache[key] = (time.time(), chan)
+        _chan_cache.move_to_end(key)
+        while len(_chan_cache) > CHAN_CACHE_SIZE:
+            _chan_cache.popitem(last=False)
+
 
 # 英文级别名称（用于图表显示，避免中文字体问题）
 KL_TYPE_NAME_EN = {
@@ -150,10 +280,7 @@ def load_stock_list() -> List[tuple]:
     csv_path = base_path / "stock_list.csv"
     if csv_path.exists():
         try:
-            import csv
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                result = [(row['code'], row['name']) for row in reader]
+            result = read_stock_csv(csv_path)
             _stock_list_cache = result
             return result
         except Exception as e:
@@ -221,7 +348,9 @@ class StockSearchEntry(ttk.Frame):
         """文本变化时触发搜索（带防抖动）"""
         if self._search_job:
             self.after_cancel(self._search_job)
-        self._search_job = self.after(200, self._do_search_internal)
+        # 输入越短匹配越多、越可能还在输入法组合中，等待越久
+        delay = search_delay_ms(self.text_var.get().strip())
+        self._search_job = self.after(delay, self._do_search_internal)
 
     def _do_search_internal(self):
         """实际执行搜索"""
@@ -231,15 +360,12 @@ class StockSearchEntry(ttk.Frame):
             self.hide_popup()
             return
 
-        self.filtered_list = []
-        for code, name in self.stock_list:
-            code_num = code.replace('sz.', '').replace('sh.', '')
-            if (keyword in code.lower() or
-                keyword in code_num or
-                keyword in name.lower()):
-                self.filtered_list.append((code, name))
-                if len(self.filtered_list) >= 50:
-                    break
+        result = search_stocks(self.stock_list, keyword, limit=50)
+        if (result == self.filtered_list and self.popup is not None
+                and self.popup.winfo_exists() and self.popup.winfo_viewable()):
+            # 结果与正在显示的相同（如输入法组合过程中的重复写入），不重建列表
+            return
+        self.filtered_list = result
 
         if self.filtered_list:
             self.show_popup()
@@ -318,19 +444,34 @@ class MultiLevelViewerWindow(tk.Toplevel):
     """多级别区间套分析窗口"""
 
     window_count = 0
-    instances: List['MultiLevelViewerWindow'] = []
+    instances: Set['MultiLevelViewerWindow'] = set()
+    _chan_config: Optional[CChanConfig] = None  # 各窗口共用的缠论配置，见 get_chan_config
 
     def __init__(self, master=None):
         super().__init__(master)
 
         MultiLevelViewerWindow.window_count += 1
-        MultiLevelViewerWindow.instances.append(self)
+        MultiLevelViewerWindow.instances.add(self)
 
         self.chan_dict: Dict[KL_TYPE, CChan] = {}  # 各级别的CChan对象
+        # 已绘制图表的状态：布局签名、各级别的子图及数据签名，用于只重绘数据变化的级别
+        self._plot_layout_key: Optional[tuple] = None
+        self._level_axes: Dict[KL_TYPE, tuple] = {}
+        # 当前子图网格 (级别数, 是否显示MACD) 及其全部子图，网格不变时复用子图而不重建
+        self._grid_key: Optional[tuple] = None
+        self._grid_axes: list = []
+        self._tight_key: Optional[tuple] = None  # 上次 tight_layout 时的 (网格, 画布宽, 画布高)
+        self._meta_cache: Dict[KL_TYPE, tuple] = {}  # 各级别 (CChan, CChanPlotMeta)
+        self._level_sigs: Dict[KL_TYPE, tuple] = {}
+        # 各级别子图上可原地更新的图元（collection、MACD 曲线）及每次重建的文字，自动刷新时复用
+        self._level_artists: Dict[KL_TYPE, dict] = {}
+        # 上次完整绘制时不含数据图元的画布背景，数据变化而坐标框架不变时恢复背景后只重画数据图元（blit）
+        self._blit_bg = None
         self.current_levels: List[KL_TYPE] = []
         self.is_analyzing = False
         self.analysis_thread: Optional[threading.Thread] = None
         self.auto_refresh_job = None  # 自动刷新任务
+        self._text_segments: Dict[str, List[Tuple[str, str]]] = {}  # 各汇总 Text 当前显示的内容
 
         self.init_ui()
 
@@ -365,6 +506,8 @@ class MultiLevelViewerWindow(tk.Toplevel):
         )
         self.history_combo.pack(side=tk.LEFT, padx=(0, 15))
         self.history_combo.bind('<<ComboboxSelected>>', self.on_history_selected)
+        self._history_version = None  # 下拉列表对应的历史记录版本
+        self._history_placeholder = ''
         self._update_history_combo()  # 初始化历史记录列表
 
         # 级别组合选择
@@ -477,6 +620,7 @@ class MultiLevelViewerWindow(tk.Toplevel):
         self.fig = Figure(figsize=(14, 12), dpi=100)
         self.canvas = FigureCanvasTkAgg(self.fig, master=chart_frame)
         self.canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
+        self.canvas.mpl_connect('draw_event', self._on_canvas_draw)
 
         # 右侧信息面板
         info_frame = ttk.Frame(content_frame, width=280)
@@ -503,6 +647,8 @@ class MultiLevelViewerWindow(tk.Toplevel):
         self.realtime_text.tag_configure("label", foreground="#666666")
         self.realtime_text.tag_configure("value", foreground="#333333")
         self.realtime_text.tag_configure("highlight", foreground="#0066cc", font=("Consolas", 9, "bold"))
+        # 当前面板上显示的实时数据，用于跳过重复重绘
+        self._realtime_shown = None
 
         ttk.Button(realtime_tab, text="刷新行情", command=self.refresh_realtime_data).pack(pady=(5, 0))
 
@@ -557,20 +703,24 @@ class MultiLevelViewerWindow(tk.Toplevel):
         return PRESET_LEVEL_COMBOS.get(combo_name, [KL_TYPE.K_DAY, KL_TYPE.K_60M])
 
     def get_chan_config(self) -> CChanConfig:
-        """获取缠论配置"""
-        return CChanConfig({
-            "bi_strict": True,
-            "trigger_step": False,
-            "divergence_rate": float("inf"),
-            "bsp2_follow_1": False,
-            "bsp3_follow_1": False,
-            "min_zs_cnt": 0,
-            "bs1_peak": False,
-            "macd_algo": "peak",
-            "bs_type": "1,1p,2,2s,3a,3b",
-            "print_warning": True,
-            "zs_algo": "normal",
-        })
+        """获取缠论配置（配置项都是常量，首次调用时构建，之后各窗口、各级别共用）"""
+        cls = MultiLevelViewerWindow
+        if cls._chan_config is None:
+            from ChanConfig import CChanConfig
+            cls._chan_config = CChanConfig({
+                "bi_strict": True,
+                "trigger_step": False,
+                "divergence_rate": float("inf"),
+                "bsp2_follow_1": False,
+                "bsp3_follow_1": False,
+                "min_zs_cnt": 0,
+                "bs1_peak": False,
+                "macd_algo": "peak",
+                "bs_type": "1,1p,2,2s,3a,3b",
+                "print_warning": True,
+                "zs_algo": "normal",
+            })
+        return cls._chan_config
 
     def get_plot_config(self) -> dict:
         """获取绑图配置"""
@@ -586,24 +736,8 @@ class MultiLevelViewerWindow(tk.Toplevel):
 
     def calc_days_for_level(self, kl_type: KL_TYPE, periods: int) -> int:
         """根据级别计算需要的天数"""
-        if kl_type == KL_TYPE.K_1M:
-            # 1分钟K线：每天约240根，至少请求5天数据确保足够
-            return max(periods // 240 + 3, 5)
-        elif kl_type == KL_TYPE.K_5M:
-            return max(periods // 48 + 5, 5)
-        elif kl_type == KL_TYPE.K_15M:
-            return max(periods // 16 + 5, 8)
-        elif kl_type == KL_TYPE.K_30M:
-            return max(periods // 8 + 5, 10)
-        elif kl_type == KL_TYPE.K_60M:
-            return max(periods // 4 + 5, 15)
-        elif kl_type == KL_TYPE.K_DAY:
-            return periods
-        elif kl_type == KL_TYPE.K_WEEK:
-            return periods * 7
-        elif kl_type == KL_TYPE.K_MON:
-            return periods * 30
-        return periods
+        meta = LEVEL_META.get(kl_type)
+        return meta[1](periods) if meta else periods
 
     def toggle_analysis(self):
         """切换分析状态"""
@@ -618,8 +752,8 @@ class MultiLevelViewerWindow(tk.Toplevel):
         self.analyze_btn.config(text="开始分析")
         self.status_var.set('分析已停止')
 
-    def start_analysis(self):
-        """开始多级别分析"""
+    def start_analysis(self, auto_refresh: bool = False):
+        """开始多级别分析；auto_refresh 为 True 时分钟级别可复用当前K线周期内的结果"""
         if self.is_analyzing:
             return
 
@@ -644,59 +778,97 @@ class MultiLevelViewerWindow(tk.Toplevel):
         # 在后台线程执行分析
         self.analysis_thread = threading.Thread(
             target=self._do_analysis_thread,
-            args=(code,),
+            args=(code, auto_refresh),
             daemon=True
         )
         self.analysis_thread.start()
 
-    def _do_analysis_thread(self, code: str):
-        """后台线程执行分析"""
-        try:
-            periods = self.periods_var.get()
-            config = self.get_chan_config()
+    def calc_begin_times(self, levels: List[KL_TYPE], periods: int) -> Dict[KL_TYPE, str]:
+        """以同一基准日期计算各级别的起始日期（跨零点时各级别也保持一致）"""
+        today = datetime.now()
+        return {
+            kl_type: (today - timedelta(days=self.calc_days_for_level(kl_type, periods))).strftime("%Y-%m-%d")
+            for kl_type in levels
+        }
 
-            for i, kl_type in enumerate(self.current_levels):
-                if not self.is_analyzing:
-                    return
+    def _analyze_one_level(self, code: str, kl_type: KL_TYPE, begin_time: str, config: CChanConfig,
+                           auto_refresh: bool = False) -> Optional[CChan]:
+        """分析单个级别（在线程池中执行），返回 CChan 对象；分析已停止时返回 None"""
+        level_name = self.get_level_name(kl_type)
+        cache_key = (code, kl_type, begin_time)
 
-                level_name = self.get_level_name(kl_type)
-                self.after(0, lambda n=level_name, idx=i: self.status_var.set(
-                    f'正在分析第 {idx+1}/{len(self.current_levels)} 级别: {n}...'
-                ))
+        # 选择数据源
+        data_src = LEVEL_META[kl_type][0]
 
-                # 计算时间范围
-                days = self.calc_days_for_level(kl_type, periods)
-                begin_time = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        # 分钟级别（AkShare）盘中持续变化，手动分析时每次都重新获取
+        ttl = _chan_cache_ttl(kl_type, auto_refresh)
+        if ttl > 0:
+            chan = _get_cached_chan(cache_key, ttl)
+            if chan is not None:
+                return chan
 
-                # 选择数据源
-                if kl_type in AKSHARE_KL_TYPES:
-                    data_src = DATA_SRC.AKSHARE
+        try:
+            # BaoStock 为全局单连接，且每次分析结束会登出，只能串行访问
+            with _BAOSTOCK_LOCK if data_src == DATA_SRC.BAO_STOCK else nullcontext():
+                if not self.is_analyzing:
+                    return None
+                # 等锁期间其他窗口可能已算好同一股票同一级别
+                if data_src == DATA_SRC.BAO_STOCK:
+                    chan = _get_cached_chan(cache_key, ttl)
+                    if chan is not None:
+                        return chan
                 else:
-                    data_src = DATA_SRC.BAO_STOCK
-
-                try:
-                    # 创建 CChan 对象
-                    chan = CChan(
-                        code=code,
-                        begin_time=begin_time,
-                        end_time=None,
-                        data_src=data_src,
-                        lv_list=[kl_type],
-                        config=config,
-                        autype=AUTYPE.QFQ,
-                    )
+                    # 先单独下载（纯网络IO，失败时重试），CChan 随后直接取用下载好的数据计算
+                    _prefetch_akshare(code, kl_type, begin_time)
+                # 创建 CChan 对象
+                from Chan import CChan
+                chan = CChan(
+                    code=code,
+                    begin_time=begin_time,
+                    end_time=None,
+                    data_src=data_src,
+                    lv_list=[kl_type],
+                    config=config,
+                    autype=AUTYPE.QFQ,
+                )
+
+            # 检查数据有效性
+            kl_data = chan[0]
+            kl_count = len(kl_data)
+            if kl_count < 10:
+                raise Exception(f"{level_name}数据不足(仅{kl_count}根K线)，请检查网络或稍后重试")
+            _put_cached_chan(cache_key, chan)
+            return chan
 
-                    # 检查数据有效性
-                    kl_data = chan[0]
-                    kl_count = len(list(kl_data))
-                    if kl_count < 10:
-                        raise Exception(f"{level_name}数据不足(仅{kl_count}根K线)，请检查网络或稍后重试")
+        except Exception as e:
+            raise Exception(f"{level_name}分析失败: {str(e)}")
 
-                    self.chan_dict[kl_type] = chan
+    def _do_analysis_thread(self, code: str, auto_refresh: bool = False):
+        """后台线程执行分析：各级别并发获取数据和计算"""
+        try:
+            begin_times = self.calc_begin_times(self.current_levels, self.periods_var.get())
+            config = self.get_chan_config()
+            total = len(self.current_levels)
 
-                except Exception as e:
-                    error_msg = f"{level_name}分析失败: {str(e)}"
-                    raise Exception(error_msg)
+            futures = {
+                _analysis_pool.submit(self._analyze_one_level, code, kl_type, begin_times[kl_type], config,
+                                      auto_refresh): kl_type
+                for kl_type in self.current_levels
+            }
+            try:
+                for done_cnt, future in enumerate(as_completed(futures), 1):
+                    chan = future.result()
+                    if chan is None or not self.is_analyzing:
+                        return
+                    kl_type = futures[future]
+                    self.chan_dict[kl_type] = chan
+                    self.after(0, lambda n=self.get_level_name(kl_type), idx=done_cnt: self.status_var.set(
+                        f'已完成 {idx}/{total} 级别: {n}...'
+                    ))
+            finally:
+                # 出错或停止时取消尚未开始的级别（已在运行的级别自行结束，结果仍会写入缓存）
+                for future in futures:
+                    future.cancel()
 
             # 在主线程更新UI
             self.after(0, lambda: self._on_analysis_done(code))
@@ -755,6 +927,12 @@ class MultiLevelViewerWindow(tk.Toplevel):
         if not code:
             return
 
+        # 其他窗口刚获取过同一股票时直接使用缓存，不再启动线程
+        cached = get_cached_realtime_data(code)
+        if cached is not None:
+            self.update_realtime_display(cached)
+            return
+
         # 在后台线程获取实时数据
         def fetch_data():
             try:
@@ -775,6 +953,7 @@ class MultiLevelViewerWindow(tk.Toplevel):
         self.realtime_text.config(state=tk.NORMAL)
         self.realtime_text.delete(1.0, tk.END)
         self.realtime_text.insert(tk.END, f"获取实时数据失败:\n{error_msg}\n\n点击\"刷新行情\"重试")
+        self._realtime_shown = None
         self.realtime_text.config(state=tk.DISABLED)
 
     def update_realtime_display(self, data: StockRealtimeData):
@@ -782,20 +961,25 @@ class MultiLevelViewerWindow(tk.Toplevel):
         if not hasattr(self, 'realtime_text'):
             return
 
-        self.realtime_text.config(state=tk.NORMAL)
-        self.realtime_text.delete(1.0, tk.END)
+        # 与当前显示的是同一份数据（如命中缓存）时不重绘
+        if data == self._realtime_shown:
+            return
+        self._realtime_shown = data
+
+        # 先收集 (文本, 标签) 片段，最后一次 insert 写入
+        segments = []
 
         # 标题：股票名称
-        self.realtime_text.insert(tk.END, f"{data.name}\n", "title")
-        self.realtime_text.insert(tk.END, f"代码: {data.code}\n\n", "label")
+        segments.append((f"{data.name}\n", "title"))
+        segments.append((f"代码: {data.code}\n\n", "label"))
 
         # 当前价格和涨跌
         price_tag = "price_up" if data.change_pct > 0 else ("price_down" if data.change_pct < 0 else "price_flat")
-        self.realtime_text.insert(tk.END, f"{data.latest_price:.2f}", price_tag)
-        self.realtime_text.insert(tk.END, f"  {data.change_pct:+.2f}%\n\n", price_tag)
+        segments.append((f"{data.latest_price:.2f}", price_tag))
+        segments.append((f"  {data.change_pct:+.2f}%\n\n", price_tag))
 
         # 关键指标
-        self.realtime_text.insert(tk.END, "━━ 核心指标 ━━\n", "highlight")
+        segments.append(("━━ 核心指标 ━━\n", "highlight"))
 
         display_data = data.get_display_dict()
 
@@ -808,10 +992,10 @@ class MultiLevelViewerWindow(tk.Toplevel):
         ]
 
         for label, value in key_fields:
-            self.realtime_text.insert(tk.END, f"{label}: ", "label")
-            self.realtime_text.insert(tk.END, f"{value}\n", "value")
+            segments.append((f"{label}: ", "label"))
+            segments.append((f"{value}\n", "value"))
 
-        self.realtime_text.insert(tk.END, "\n━━ 价格信息 ━━\n", "highlight")
+        segments.append(("\n━━ 价格信息 ━━\n", "highlight"))
 
         price_fields = [
             ("最高", display_data["最高"]),
@@ -821,10 +1005,10 @@ class MultiLevelViewerWindow(tk.Toplevel):
         ]
 
         for label, value in price_fields:
-            self.realtime_text.insert(tk.END, f"{label}: ", "label")
-            self.realtime_text.insert(tk.END, f"{value}\n", "value")
+            segments.append((f"{label}: ", "label"))
+            segments.append((f"{value}\n", "value"))
 
-        self.realtime_text.insert(tk.END, "\n━━ 成交信息 ━━\n", "highlight")
+        segments.append(("\n━━ 成交信息 ━━\n", "highlight"))
 
         volume_fields = [
             ("成交量", display_data["成交量"]),
@@ -832,10 +1016,10 @@ class MultiLevelViewerWindow(tk.Toplevel):
         ]
 
         for label, value in volume_fields:
-            self.realtime_text.insert(tk.END, f"{label}: ", "label")
-            self.realtime_text.insert(tk.END, f"{value}\n", "value")
+            segments.append((f"{label}: ", "label"))
+            segments.append((f"{value}\n", "value"))
 
-        self.realtime_text.insert(tk.END, "\n━━ 涨跌限制 ━━\n", "highlight")
+        segments.append(("\n━━ 涨跌限制 ━━\n", "highlight"))
 
         limit_fields = [
             ("涨停价", display_data["涨停价"]),
@@ -844,20 +1028,20 @@ class MultiLevelViewerWindow(tk.Toplevel):
         ]
 
         for label, value in limit_fields:
-            self.realtime_text.insert(tk.END, f"{label}: ", "label")
-            self.realtime_text.insert(tk.END, f"{value}\n", "value")
+            segments.append((f"{label}: ", "label"))
+            segments.append((f"{value}\n", "value"))
 
         # 更新时间
-        self.realtime_text.insert(tk.END, f"\n更新: {data.update_time.strftime('%H:%M:%S')}", "label")
+        segments.append((f"\n更新: {data.update_time.strftime('%H:%M:%S')}", "label"))
 
+        self.realtime_text.config(state=tk.NORMAL)
+        self.realtime_text.delete(1.0, tk.END)
+        self.realtime_text.insert(tk.END, *(item for segment in segments for item in segment))
         self.realtime_text.config(state=tk.DISABLED)
 
     def get_level_name(self, kl_type: KL_TYPE) -> str:
         """获取级别名称"""
-        for name, kt in KL_TYPE_MAP.items():
-            if kt == kl_type:
-                return name
-        return str(kl_type)
+        return KL_TYPE_NAME_CN.get(kl_type, str(kl_type))
 
     def plot_charts(self):
         """绑制多级别图表 - 使用原项目 PlotDriver"""
@@ -865,22 +1049,28 @@ class MultiLevelViewerWindow(tk.Toplevel):
             return
 
         try:
-            from Plot.PlotDriver import CPlotDriver
-
-            plt.close('all')
-
             plot_config = self.get_plot_config()
             num_levels = len(self.current_levels)
 
-            # 清除旧图
-            self.fig.clear()
-
             # 获取画布实际大小来计算合适的图表尺寸
             canvas_widget = self.canvas.get_tk_widget()
             canvas_width = canvas_widget.winfo_width()
             canvas_height = canvas_widget.winfo_height()
             dpi = 100
 
+            # 布局未变时只重绘数据有变化的级别（如自动刷新时只有分钟级别更新）
+            layout_key = (
+                tuple((kl_type, kl_type in self.chan_dict) for kl_type in self.current_levels),
+                tuple(plot_config.items()), canvas_width, canvas_height,
+            )
+            if layout_key == self._plot_layout_key:
+                self._replot_dirty_levels(plot_config)
+                return
+            self._plot_layout_key = None
+            self._level_axes.clear()
+            self._level_sigs.clear()
+            self._level_artists.clear()
+
             # 为每个级别单独绑制，然后组合
             # 计算每个级别的高度（4级别时适当压缩）
             min_level_height = 2.5 if num_levels >= 4 else 3
@@ -898,10 +1088,19 @@ class MultiLevelViewerWindow(tk.Toplevel):
                 height_ratios = [1] * num_levels
                 total_rows = num_levels
 
-            # 创建子图
-            axes = self.fig.subplots(total_rows, 1, gridspec_kw={'height_ratios': height_ratios})
-            if total_rows == 1:
-                axes = [axes]
+            # 子图网格不变（如只是切换显示选项、窗口大小变化）时清空原子图复用，否则重建
+            grid_key = (num_levels, plot_config.get("plot_macd", False))
+            if grid_key == self._grid_key:
+                for ax in self._grid_axes:
+                    ax.cla()
+            else:
+                self._grid_key = None
+                self._tight_key = None
+                self.fig.clear()
+                axes = self.fig.subplots(total_rows, 1, gridspec_kw={'height_ratios': height_ratios})
+                self._grid_axes = list(axes) if total_rows > 1 else [axes]
+                self._grid_key = grid_key
+            axes = self._grid_axes
 
             # 为每个级别绘制
             ax_idx = 0
@@ -926,25 +1125,136 @@ class MultiLevelViewerWindow(tk.Toplevel):
 
                 # 使用原项目的绘图逻辑绘制单个级别
                 self._plot_level_with_driver(chan, ax_main, ax_macd, level_name_en, plot_config)
-
-            self.fig.tight_layout()
-            self.canvas.draw()
+                self._level_axes[kl_type] = (ax_main, ax_macd)
+                self._animate_level_artists(kl_type)
+                self._level_sigs[kl_type] = self._level_signature(chan)
+
+            # tight_layout 需要测量所有文字，只在网格或画布大小变化时重新计算子图间距
+            tight_key = (grid_key, canvas_width, canvas_height)
+            if tight_key != self._tight_key:
+                self.fig.tight_layout()
+                self._tight_key = tight_key
+            self._blit_bg = None
+            self.canvas.draw_idle()
+            self._plot_layout_key = layout_key
 
         except Exception as e:
+            self._plot_layout_key = None
+            self._grid_key = None
             messagebox.showerror("绑图错误", str(e))
             import traceback
             traceback.print_exc()
 
+    @staticmethod
+    def _level_signature(chan: CChan) -> tuple:
+        """级别数据签名：K线数量、最后一根K线单元的时间和收盘价"""
+        kl_list = chan[0]
+        if not len(kl_list):
+            return (0, None, None)
+        last_klu = kl_list[-1][-1]
+        return (len(kl_list), last_klu.time.ts, last_klu.close)
+
+    def _replot_dirty_levels(self, plot_config: dict):
+        """布局不变时，只重绘数据签名变化的级别子图，其余子图保持不动；
+        子图不清空，已有图元原地更新数据"""
+        dirty = False
+        frame_changed = False
+        for kl_type, (ax_main, ax_macd) in self._level_axes.items():
+            chan = self.chan_dict.get(kl_type)
+            if chan is None:
+                continue
+            sig = self._level_signature(chan)
+            if sig == self._level_sigs.get(kl_type):
+                continue
+            frame = self._axes_frame(ax_main, ax_macd)
+            level_name_en = KL_TYPE_NAME_EN.get(kl_type, str(kl_type))
+            self._plot_level_with_driver(chan, ax_main, ax_macd, level_name_en, plot_config)
+            self._animate_level_artists(kl_type)
+            self._level_sigs[kl_type] = sig
+            dirty = True
+            if self._axes_frame(ax_main, ax_macd) != frame:
+                frame_changed = True
+        if not dirty:
+            return
+        if frame_changed or self._blit_bg is None:
+            self.canvas.draw_idle()
+        else:
+            # 坐标范围和刻度都没变（如同一根K线内价格更新），背景仍然有效，只重画数据图元
+            self.canvas.restore_region(self._blit_bg)
+            for artist in self._dynamic_artists():
+                self.fig.draw_artist(artist)
+            self.canvas.blit(self.fig.bbox)
+
+    @staticmethod
+    def _axes_frame(ax_main, ax_macd) -> tuple:
+        """子图坐标框架（坐标范围、x轴刻度及标签）的签名，不变时 blit 背景仍然有效"""
+        axes = (ax_main,) if ax_macd is None else (ax_main, ax_macd)
+        return tuple(
+            (ax.get_xlim(), ax.get_ylim(), tuple(ax.get_xticks()), tuple(t.get_text() for t in ax.get_xticklabels()))
+            for ax in axes
+        )
+
+    def _animate_level_artists(self, kl_type: KL_TYPE):
+        """把级别的数据图元和标题设为 animated：完整绘制时不进入背景，由 _on_canvas_draw 画在背景之上"""
+        ax_main = self._level_axes[kl_type][0]
+        ax_main.title.set_animated(True)
+        for key, artist in self._level_artists.get(kl_type, {}).items():
+            for a in (artist if key == 'texts' else (artist,)):
+                a.set_animated(True)
+
+    def _dynamic_artists(self) -> list:
+        """所有级别的 animated 图元，按 zorder 排序"""
+        result = []
+        for kl_type, (ax_main, _) in self._level_axes.items():
+            result.append(ax_main.title)
+            for key, artist in self._level_artists.get(kl_type, {}).items():
+                if key == 'texts':
+                    result.extend(artist)
+                else:
+                    result.append(artist)
+        result.sort(key=lambda a: a.get_zorder())
+        return result
+
+    def _on_canvas_draw(self, event):
+        """完整绘制后保存背景，再把 animated 的数据图元画上去（保存图片时 savefig 自己会画 animated 图元）"""
+        if self.canvas.is_saving():
+            return
+        self._blit_bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self._dynamic_artists():
+            self.fig.draw_artist(artist)
+
     def _plot_level_with_driver(self, chan: CChan, ax, ax_macd, level_name: str, plot_config: dict):
         """使用原项目的绘图逻辑绑制单个级别的图表"""
         from Plot.PlotMeta import CChanPlotMeta
-        from matplotlib.patches import Rectangle
+        from matplotlib.collections import LineCollection, PolyCollection
 
         kl_data = chan[0]
-        meta = CChanPlotMeta(kl_data)
+        # 分析完成后 CChan 不再变化，同一 CChan 重绘（切换显示选项、窗口缩放）时复用绘图元数据
+        cached = self._meta_cache.get(kl_data.kl_type)
+        if cached is not None and cached[0] is chan:
+            meta = cached[1]
+        else:
+            meta = CChanPlotMeta(kl_data)
+            self._meta_cache[kl_data.kl_type] = (chan, meta)
+
+        # 坐标范围都由下面根据数据显式设置，关闭自动缩放，添加图元时不再维护自动缩放
+        ax.set_autoscale_on(False)
+        if ax_macd is not None:
+            ax_macd.set_autoscale_on(False)
+
+        # 上次绘制的 collection/曲线在下面原地更新；文字（买卖点标注等）每次重建
+        artists = self._level_artists.setdefault(kl_data.kl_type, {})
+        texts = artists.setdefault('texts', [])
+        for text in texts:
+            text.remove()
+        texts.clear()
 
         if meta.klu_len == 0:
-            ax.text(0.5, 0.5, f'{level_name}: 无数据', ha='center', va='center', transform=ax.transAxes)
+            for key, artist in list(artists.items()):
+                if key != 'texts':
+                    artist.remove()
+                    del artists[key]
+            texts.append(ax.text(0.5, 0.5, f'{level_name}: 无数据', ha='center', va='center', transform=ax.transAxes))
             return
 
         # 计算x轴范围（显示最近150个K线）
@@ -956,79 +1266,89 @@ class MultiLevelViewerWindow(tk.Toplevel):
         x_tick_num = 8
         ax.set_xlim(x_limits[0], x_limits[1] + 1)
         tick_step = max([1, int((x_limits[1] - x_limits[0]) / float(x_tick_num))])
-        ax.set_xticks(range(x_limits[0], x_limits[1], tick_step))
-        ax.set_xticklabels([meta.datetick[i] if i < len(meta.datetick) else '' for i in ax.get_xticks()], rotation=20, fontsize=7)
+        # 刻度位置都在 [0, klu_len) 内，直接按位置取 datetick，不再回读 get_xticks 并逐个判断越界
+        x_ticks = range(x_limits[0], x_limits[1], tick_step)
+        ax.set_xticks(x_ticks)
+        ax.set_xticklabels([meta.datetick[i] for i in x_ticks], rotation=20, fontsize=7)
 
-        # 计算y轴范围
+        # 计算y轴范围，同时收集合并K线的矩形框（一次遍历 klc_list）
+        from Common.CEnum import FX_TYPE, KLINE_DIR
+        color_type = {FX_TYPE.TOP: 'red', FX_TYPE.BOTTOM: 'blue', KLINE_DIR.UP: 'green', KLINE_DIR.DOWN: 'green'}
+        width = 0.4
         x_begin = ax.get_xlim()[0]
         y_min = float("inf")
         y_max = float("-inf")
+        klc_boxes, klc_colors = [], []
         for klc_meta in meta.klc_list:
-            if klc_meta.klu_list[-1].idx < x_begin:
+            last_idx = klc_meta.klu_list[-1].idx
+            if last_idx + width < x_begin:
+                continue
+            left = klc_meta.begin_idx - width
+            right = klc_meta.end_idx + width
+            klc_boxes.append(((left, klc_meta.low), (right, klc_meta.low), (right, klc_meta.high), (left, klc_meta.high)))
+            klc_colors.append(color_type.get(klc_meta.type, 'gray'))
+            if last_idx < x_begin:
                 continue
             if klc_meta.high > y_max:
                 y_max = klc_meta.high
             if klc_meta.low < y_min:
                 y_min = klc_meta.low
 
-        # 绘制K线
+        # 绘制K线：实体合成一个 PolyCollection、影线合成一个 LineCollection，不再每根K线单独添加图元
         if plot_config.get("plot_kline", False):
             width = 0.4
+            half = width / 2
+            bodies, body_faces, body_edges = [], [], []
+            wicks, wick_colors = [], []
             for kl in meta.klu_iter():
                 i = kl.idx
                 if i + width < x_begin:
                     continue
+                bodies.append(((i - half, kl.open), (i + half, kl.open), (i + half, kl.close), (i - half, kl.close)))
                 if kl.close > kl.open:
-                    ax.add_patch(Rectangle((i - width / 2, kl.open), width, kl.close - kl.open, fill=False, color='r'))
-                    ax.plot([i, i], [kl.low, kl.open], 'r')
-                    ax.plot([i, i], [kl.close, kl.high], 'r')
+                    # 阳线：空心红色实体，上下影线分开画
+                    body_faces.append('none')
+                    body_edges.append('r')
+                    wicks.append(((i, kl.low), (i, kl.open)))
+                    wicks.append(((i, kl.close), (i, kl.high)))
+                    wick_colors.extend(('r', 'r'))
                 else:
-                    ax.add_patch(Rectangle((i - width / 2, kl.open), width, kl.close - kl.open, color='g'))
-                    ax.plot([i, i], [kl.low, kl.high], color='g')
-
-        # 绘制合并K线
-        from Common.CEnum import FX_TYPE, KLINE_DIR
+                    body_faces.append('g')
+                    body_edges.append('g')
+                    wicks.append(((i, kl.low), (i, kl.high)))
+                    wick_colors.append('g')
+            _put_collection(artists, 'kline_body', ax, PolyCollection, bodies, facecolors=body_faces, edgecolors=body_edges)
+            _put_collection(artists, 'kline_wick', ax, LineCollection, wicks, color=wick_colors)
+
+        # 绘制合并K线：全部矩形框合成一个 PolyCollection
         if plot_config.get("plot_kline_combine", True):
-            color_type = {FX_TYPE.TOP: 'red', FX_TYPE.BOTTOM: 'blue', KLINE_DIR.UP: 'green', KLINE_DIR.DOWN: 'green'}
-            width = 0.4
-            for klc_meta in meta.klc_list:
-                if klc_meta.klu_list[-1].idx + width < x_begin:
-                    continue
-                ax.add_patch(
-                    Rectangle(
-                        (klc_meta.begin_idx - width, klc_meta.low),
-                        klc_meta.end_idx - klc_meta.begin_idx + width * 2,
-                        klc_meta.high - klc_meta.low,
-                        fill=False,
-                        color=color_type.get(klc_meta.type, 'gray')))
+            _put_collection(artists, 'klc', ax, PolyCollection, klc_boxes, facecolors='none', edgecolors=klc_colors)
 
-        # 绘制笔
+        # 绘制笔、线段：各合成一个 LineCollection（未确定的用虚线）
         if plot_config.get("plot_bi", True):
-            for bi in meta.bi_list:
-                if bi.end_x < x_begin:
-                    continue
-                if bi.is_sure:
-                    ax.plot([bi.begin_x, bi.end_x], [bi.begin_y, bi.end_y], color='black')
-                else:
-                    ax.plot([bi.begin_x, bi.end_x], [bi.begin_y, bi.end_y], linestyle='dashed', color='black')
+            bi_visible = _visible_tail(meta.bi_list, x_begin)
+            _put_collection(
+                artists, 'bi', ax, LineCollection,
+                [((bi.begin_x, bi.begin_y), (bi.end_x, bi.end_y)) for bi in bi_visible],
+                color='black',
+                linestyles=['solid' if bi.is_sure else 'dashed' for bi in bi_visible])
 
-        # 绘制线段
         if plot_config.get("plot_seg", True):
-            for seg_meta in meta.seg_list:
-                if seg_meta.end_x < x_begin:
-                    continue
-                if seg_meta.is_sure:
-                    ax.plot([seg_meta.begin_x, seg_meta.end_x], [seg_meta.begin_y, seg_meta.end_y], color='g', linewidth=5)
-                else:
-                    ax.plot([seg_meta.begin_x, seg_meta.end_x], [seg_meta.begin_y, seg_meta.end_y], color='g', linewidth=5, linestyle='dashed')
-
-        # 绘制中枢
+            seg_visible = _visible_tail(meta.seg_list, x_begin)
+            _put_collection(
+                artists, 'seg', ax, LineCollection,
+                [((seg.begin_x, seg.begin_y), (seg.end_x, seg.end_y)) for seg in seg_visible],
+                color='g', linewidths=5, capstyle='projecting',
+                linestyles=['solid' if seg.is_sure else 'dashed' for seg in seg_visible])
+
+        # 绘制中枢：全部矩形框合成一个 PolyCollection
         if plot_config.get("plot_zs", True):
-            for zs_meta in meta.zs_lst:
-                if zs_meta.begin + zs_meta.w < x_begin:
-                    continue
-                line_style = '-' if zs_meta.is_sure else '--'
-                ax.add_patch(Rectangle((zs_meta.begin, zs_meta.low), zs_meta.w, zs_meta.h, fill=False, color='orange', linewidth=2, linestyle=line_style))
+            zs_visible = [zs_meta for zs_meta in meta.zs_lst if zs_meta.begin + zs_meta.w >= x_begin]
+            _put_collection(
+                artists, 'zs', ax, PolyCollection,
+                [((zs.begin, zs.low), (zs.end, zs.low), (zs.end, zs.high), (zs.begin, zs.high)) for zs in zs_visible],
+                facecolors='none', edgecolors='orange', linewidths=2,
+                linestyles=['solid' if zs.is_sure else 'dashed' for zs in zs_visible])
 
         # 绘制买卖点
         if plot_config.get("plot_bsp", True):
@@ -1036,6 +1356,8 @@ class MultiLevelViewerWindow(tk.Toplevel):
             arrow_l = 0.15
             arrow_h = 0.2
             arrow_w = 1
+            shaft_w = 0.001  # 与 ax.arrow 默认箭杆宽度一致
+            arrows, arrow_colors = [], []
             for bsp in meta.bs_point_lst:
                 if bsp.x < x_begin:
                     continue
@@ -1043,43 +1365,56 @@ class MultiLevelViewerWindow(tk.Toplevel):
                 arrow_dir = 1 if bsp.is_buy else -1
                 arrow_len = arrow_l * y_range
                 arrow_head = arrow_len * arrow_h
-                ax.text(bsp.x,
-                        bsp.y - arrow_len * arrow_dir,
-                        f'{bsp.desc()}',
-                        fontsize=10,
-                        color=color,
-                        verticalalignment='top' if bsp.is_buy else 'bottom',
-                        horizontalalignment='center')
-                ax.arrow(bsp.x,
-                         bsp.y - arrow_len * arrow_dir,
-                         0,
-                         (arrow_len - arrow_head) * arrow_dir,
-                         head_width=arrow_w,
-                         head_length=arrow_head,
-                         color=color)
+                texts.append(ax.text(bsp.x,
+                                     bsp.y - arrow_len * arrow_dir,
+                                     f'{bsp.desc()}',
+                                     fontsize=10,
+                                     color=color,
+                                     verticalalignment='top' if bsp.is_buy else 'bottom',
+                                     horizontalalignment='center'))
+                # 箭头轮廓与 ax.arrow(x, y_start, 0, (arrow_len - arrow_head) * dir, head_width, head_length) 相同：
+                # 箭杆从标注处到箭头底部，箭头尖端指向买卖点
+                x = bsp.x
+                y_start = bsp.y - arrow_len * arrow_dir
+                y_neck = bsp.y - arrow_head * arrow_dir
+                arrows.append((
+                    (x - shaft_w / 2, y_start), (x - shaft_w / 2, y_neck), (x - arrow_w / 2, y_neck), (x, bsp.y),
+                    (x + arrow_w / 2, y_neck), (x + shaft_w / 2, y_neck), (x + shaft_w / 2, y_start),
+                ))
+                arrow_colors.append(color)
                 # 更新y范围以包含买卖点标注
                 if bsp.y - arrow_len * arrow_dir < y_min:
                     y_min = bsp.y - arrow_len * arrow_dir
                 if bsp.y - arrow_len * arrow_dir > y_max:
                     y_max = bsp.y - arrow_len * arrow_dir
+            # 所有箭头合成一个 PolyCollection
+            _put_collection(artists, 'bsp_arrow', ax, PolyCollection, arrows, facecolors=arrow_colors, edgecolors=arrow_colors)
 
         # 绘制MACD
         if plot_config.get("plot_macd", False) and ax_macd is not None:
-            macd_lst = [klu.macd for klu in meta.klu_iter()]
-            if macd_lst and macd_lst[0] is not None:
+            first_klu = next(meta.klu_iter(), None)
+            if first_klu is not None and first_klu.macd is not None:
                 width = 0.4
-                x_idx = range(len(macd_lst))[x_limits[0]:]
-                dif_line = [macd.DIF for macd in macd_lst[x_limits[0]:]]
-                dea_line = [macd.DEA for macd in macd_lst[x_limits[0]:]]
-                macd_bar = [macd.macd for macd in macd_lst[x_limits[0]:]]
-                macd_y_min = min([min(dif_line), min(dea_line), min(macd_bar)])
-                macd_y_max = max([max(dif_line), max(dea_line), max(macd_bar)])
-                ax_macd.plot(x_idx, dif_line, "#FFA500")
-                ax_macd.plot(x_idx, dea_line, "#0000ff")
-                _bar = ax_macd.bar(x_idx, macd_bar, color="r", width=width)
-                for idx, macd in enumerate(macd_bar):
-                    if macd < 0:
-                        _bar[idx].set_color("#006400")
+                # 只遍历可见区间一次，同时取出 DIF/DEA、柱体矩形、颜色和上下界
+                dif_line, dea_line, macd_bars, bar_colors = [], [], [], []
+                macd_y_min, macd_y_max = float('inf'), float('-inf')
+                for x, klu in enumerate(itertools.islice(meta.klu_iter(), x_limits[0], None), x_limits[0]):
+                    macd = klu.macd
+                    dif_line.append(macd.DIF)
+                    dea_line.append(macd.DEA)
+                    macd_bars.append(((x - width / 2, 0), (x - width / 2, macd.macd),
+                                      (x + width / 2, macd.macd), (x + width / 2, 0)))
+                    bar_colors.append("#006400" if macd.macd < 0 else "r")
+                    macd_y_min = min(macd_y_min, macd.DIF, macd.DEA, macd.macd)
+                    macd_y_max = max(macd_y_max, macd.DIF, macd.DEA, macd.macd)
+                x_idx = range(x_limits[0], x_limits[0] + len(dif_line))
+                for key, line, color in (('dif', dif_line, "#FFA500"), ('dea', dea_line, "#0000ff")):
+                    if key in artists:
+                        artists[key].set_data(x_idx, line)
+                    else:
+                        artists[key] = ax_macd.plot(x_idx, line, color)[0]
+                # MACD 柱合成一个 PolyCollection，不再每根柱子一个 Rectangle
+                _put_collection(artists, 'macd_bar', ax_macd, PolyCollection, macd_bars, facecolors=bar_colors, edgecolors='none')
                 ax_macd.set_ylim(macd_y_min, macd_y_max)
                 ax_macd.set_xlim(x_limits[0], x_limits[1] + 1)
 
@@ -1094,6 +1429,8 @@ class MultiLevelViewerWindow(tk.Toplevel):
 
     def _plot_single_level(self, ax, chan: CChan, level_name: str, plot_config: dict):
         """绑制单个级别的图表（备用方法）"""
+        from matplotlib.patches import Rectangle
+
         kl_data = chan[0]
 
         # 获取K线数据
@@ -1148,7 +1485,7 @@ class MultiLevelViewerWindow(tk.Toplevel):
                 begin_idx = zs.begin.idx
                 end_idx = zs.end.idx
                 if begin_idx < len(klines) and end_idx < len(klines):
-                    rect = plt.Rectangle(
+                    rect = Rectangle(
                         (begin_idx, zs.low),
                         end_idx - begin_idx,
                         zs.high - zs.low,
@@ -1192,7 +1529,7 @@ class MultiLevelViewerWindow(tk.Toplevel):
 
     def update_bsp_summary(self):
         """更新买卖点汇总"""
-        self.bsp_text.delete(1.0, tk.END)
+        segments = []
 
         for kl_type in self.current_levels:
             if kl_type not in self.chan_dict:
@@ -1202,10 +1539,10 @@ class MultiLevelViewerWindow(tk.Toplevel):
             kl_data = chan[0]
             level_name = self.get_level_name(kl_type)
 
-            self.bsp_text.insert(tk.END, f"【{level_name}】\n", "header")
+            segments.append((f"【{level_name}】\n", "header"))
 
             if len(kl_data.bs_point_lst) == 0:
-                self.bsp_text.insert(tk.END, "  无买卖点\n\n")
+                segments.append(("  无买卖点\n\n", ""))
                 continue
 
             # 按时间倒序显示最近的买卖点
@@ -1214,16 +1551,16 @@ class MultiLevelViewerWindow(tk.Toplevel):
                 bsp_type = bsp.type2str()
                 prefix = '买' if bsp.is_buy else '卖'
                 price = f"{bsp.bi.get_end_val():.2f}"
-                self.bsp_text.insert(tk.END, f"  {prefix}{bsp_type}: {price}\n")
+                segments.append((f"  {prefix}{bsp_type}: {price}\n", ""))
 
-            self.bsp_text.insert(tk.END, "\n")
+            segments.append(("\n", ""))
+
+        self._fill_text(self.bsp_text, segments)
 
     def analyze_interval_nesting(self):
         """分析区间套（支持2-4级别共振）"""
-        self.nesting_text.delete(1.0, tk.END)
-
         if len(self.current_levels) < 2:
-            self.nesting_text.insert(tk.END, "需要至少2个级别才能进行区间套分析\n")
+            self._fill_text(self.nesting_text, [("需要至少2个级别才能进行区间套分析\n", "")])
             return
 
         # 收集各级别的最近买卖点
@@ -1236,32 +1573,37 @@ class MultiLevelViewerWindow(tk.Toplevel):
             level_name = self.get_level_name(kl_type)
 
             if len(kl_data.bs_point_lst) > 0:
-                buy_points = [bsp for bsp in kl_data.bs_point_lst.bsp_iter() if bsp.is_buy]
-                sell_points = [bsp for bsp in kl_data.bs_point_lst.bsp_iter() if not bsp.is_buy]
-
-                latest_buy = max(buy_points, key=lambda x: x.klu.idx) if buy_points else None
-                latest_sell = max(sell_points, key=lambda x: x.klu.idx) if sell_points else None
+                # 一次遍历同时找出最近的买点和卖点
+                latest_buy = latest_sell = None
+                for bsp in kl_data.bs_point_lst.bsp_iter():
+                    if bsp.is_buy:
+                        if latest_buy is None or bsp.klu.idx > latest_buy.klu.idx:
+                            latest_buy = bsp
+                    elif latest_sell is None or bsp.klu.idx > latest_sell.klu.idx:
+                        latest_sell = bsp
 
                 level_bsp_info[level_name] = {
                     'buy': latest_buy,
                     'sell': latest_sell,
-                    'kl_count': len(list(kl_data))
+                    'kl_count': len(kl_data)
                 }
 
         if not level_bsp_info:
-            self.nesting_text.insert(tk.END, "各级别均无买卖点\n")
+            self._fill_text(self.nesting_text, [("各级别均无买卖点\n", "")])
             return
 
         total_levels = len(self.current_levels)
-        self.nesting_text.insert(tk.END, f"【{total_levels}级别区间套共振分析】\n\n")
+        segments = [(f"【{total_levels}级别区间套共振分析】\n\n", "")]
 
         # 分析买点共振
         buy_resonance = self._collect_resonance(level_bsp_info, is_buy=True)
-        self._display_resonance(buy_resonance, is_buy=True, total_levels=total_levels)
+        self._display_resonance(segments, buy_resonance, is_buy=True, total_levels=total_levels)
 
         # 分析卖点共振
         sell_resonance = self._collect_resonance(level_bsp_info, is_buy=False)
-        self._display_resonance(sell_resonance, is_buy=False, total_levels=total_levels)
+        self._display_resonance(segments, sell_resonance, is_buy=False, total_levels=total_levels)
+
+        self._fill_text(self.nesting_text, segments)
 
     def _collect_resonance(self, level_bsp_info: dict, is_buy: bool) -> list:
         """收集买点或卖点共振信息"""
@@ -1280,20 +1622,19 @@ class MultiLevelViewerWindow(tk.Toplevel):
                 })
         return resonance
 
-    def _display_resonance(self, resonance: list, is_buy: bool, total_levels: int):
-        """显示共振分析结果"""
+    def _display_resonance(self, segments: list, resonance: list, is_buy: bool, total_levels: int):
+        """将共振分析结果追加到 segments"""
         signal_type = "买点" if is_buy else "卖点"
         action = "做多" if is_buy else "做空/减仓"
 
         if not resonance:
-            self.nesting_text.insert(tk.END, f"{signal_type}信号: 无\n\n")
+            segments.append((f"{signal_type}信号: 无\n\n", ""))
             return
 
-        self.nesting_text.insert(tk.END, f"{signal_type}信号:\n")
+        segments.append((f"{signal_type}信号:\n", ""))
         for r in resonance:
             recent_str = "★近期" if r['recency'] < 0.1 else "较早"
-            self.nesting_text.insert(tk.END,
-                f"  {r['level']}: {r['type']}类 @{r['price']:.2f} ({recent_str})\n")
+            segments.append((f"  {r['level']}: {r['type']}类 @{r['price']:.2f} ({recent_str})\n", ""))
 
         # 计算共振强度
         recent_count = sum(1 for r in resonance if r['recency'] < 0.1)
@@ -1317,8 +1658,18 @@ class MultiLevelViewerWindow(tk.Toplevel):
             desc = ""
 
         if strength:
-            self.nesting_text.insert(tk.END, f"\n  {strength}\n  {desc}\n")
-        self.nesting_text.insert(tk.END, "\n")
+            segments.append((f"\n  {strength}\n  {desc}\n", ""))
+        segments.append(("\n", ""))
+
+    def _fill_text(self, widget: tk.Text, segments: List[Tuple[str, str]]):
+        """用一次 insert 替换 Text 的全部内容，segments 为 (文本, 标签) 列表；内容与上次相同时不重绘"""
+        key = str(widget)
+        if self._text_segments.get(key) == segments:
+            return
+        self._text_segments[key] = segments
+        widget.delete(1.0, tk.END)
+        if segments:
+            widget.insert(tk.END, *(item for segment in segments for item in segment))
 
     def show_interval_nesting_info(self):
         """显示区间套原理说明"""
@@ -1374,20 +1725,43 @@ class MultiLevelViewerWindow(tk.Toplevel):
 
     def _schedule_refresh(self, interval: int):
         """调度自动刷新"""
-        if self.auto_refresh_var.get():
-            self.start_analysis()
-            self.auto_refresh_job = self.after(interval, lambda: self._schedule_refresh(interval))
+        if not self.auto_refresh_var.get():
+            return
+        if self.is_analyzing:
+            # 上一次分析尚未结束，放弃本次刷新，稍后再试
+            self.auto_refresh_job = self.after(AUTO_REFRESH_RETRY_MS, lambda: self._schedule_refresh(interval))
+            return
+        if self._has_due_level():
+            self.start_analysis(auto_refresh=True)
+        else:
+            # 各级别当前K线都未走完（可能由其他窗口刚刷新过），只刷新实时行情
+            self.refresh_realtime_data()
+        self.auto_refresh_job = self.after(interval, lambda: self._schedule_refresh(interval))
+
+    def _has_due_level(self) -> bool:
+        """当前选择的级别中是否有需要刷新的：缓存中没有当前K线周期内的结果，
+        或缓存结果（如其他窗口刚刷新的）与本窗口正在显示的不是同一份"""
+        code = self.get_current_code()
+        if not code:
+            return True
+        levels = self.get_selected_levels()
+        begin_times = self.calc_begin_times(levels, self.periods_var.get())
+        for kl_type in levels:
+            chan = _get_cached_chan((code, kl_type, begin_times[kl_type]), _chan_cache_ttl(kl_type, auto_refresh=True))
+            if chan is None or chan is not self.chan_dict.get(kl_type):
+                return True
+        return False
 
     def _update_history_combo(self):
         """更新历史记录下拉框"""
         history = get_stock_history()
-        display_list = history.get_display_list(limit=15)
-        if display_list:
-            self.history_combo['values'] = ['-- 历史记录 --'] + display_list
-            self.history_var.set('-- 历史记录 --')
-        else:
-            self.history_combo['values'] = ['-- 无历史记录 --']
-            self.history_var.set('-- 无历史记录 --')
+        # 历史记录显示内容未变化（如反复分析同一只股票）时不重建下拉列表
+        if history.version != self._history_version:
+            self._history_version = history.version
+            display_list = history.get_display_list(limit=15)
+            self._history_placeholder = '-- 历史记录 --' if display_list else '-- 无历史记录 --'
+            self.history_combo['values'] = [self._history_placeholder] + display_list
+        self.history_var.set(self._history_placeholder)
 
     def on_history_selected(self, event=None):
         """历史记录选择事件"""
@@ -1404,16 +1778,20 @@ class MultiLevelViewerWindow(tk.Toplevel):
         history.add(code, name)
         self._update_history_combo()
 
-    def on_close(self):
-        """窗口关闭"""
+    def shutdown(self):
+        """释放窗口资源（停止分析、取消自动刷新、移出实例列表），不销毁窗口"""
         if self.is_analyzing:
             self.stop_analysis()
 
         if self.auto_refresh_job:
             self.after_cancel(self.auto_refresh_job)
+            self.auto_refresh_job = None
 
-        if self in MultiLevelViewerWindow.instances:
-            MultiLevelViewerWindow.instances.remove(self)
+        MultiLevelViewerWindow.instances.discard(self)
+
+    def on_close(self):
+        """窗口关闭"""
+        self.shutdown()
 
         # 只有当 master 是 MultiLevelApp（独立运行）时才退出主程序
         # 如果是从 ChanApp 统一入口启动的，不要退出
@@ -19,7 +19,7 @@ import io
 import queue
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Set
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
@@ -61,7 +61,6 @@ _setup_path()
 
 import matplotlib
 matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
@@ -69,7 +68,8 @@ from Chan import CChan
 from ChanConfig import CChanConfig
 from Common.CEnum import AUTYPE, DATA_SRC, KL_TYPE
 from stock_history import get_stock_history
-from stock_realtime import get_stock_realtime_data, StockRealtimeData
+from stock_list import read_stock_csv, search_stocks, search_delay_ms
+from stock_realtime import get_stock_realtime_data, get_cached_realtime_data, StockRealtimeData
 
 
 # K线周期映射（按指定顺序）
@@ -136,10 +136,7 @@ def load_stock_list() -> List[tuple]:
 
     if csv_path.exists():
         try:
-            import csv
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                result = [(row['code'], row['name']) for row in reader]
+            result = read_stock_csv(csv_path)
             _stock_list_cache = result
             print(f"已从本地文件加载 {len(result)} 只股票")
             return result
@@ -227,8 +224,9 @@ class StockSearchEntry(ttk.Frame):
         # 取消之前的搜索任务
         if self._search_job:
             self.after_cancel(self._search_job)
-        # 延迟 200ms 执行搜索，支持中文输入法组合
-        self._search_job = self.after(200, self._do_search_internal)
+        # 输入越短匹配越多、越可能还在输入法组合中，等待越久
+        delay = search_delay_ms(self.text_var.get().strip())
+        self._search_job = self.after(delay, self._do_search_internal)
 
     def _do_search_internal(self):
         """实际执行搜索"""
@@ -239,15 +237,12 @@ class StockSearchEntry(ttk.Frame):
             return
 
         # 模糊搜索
-        self.filtered_list = []
-        for code, name in self.stock_list:
-            code_num = code.replace('sz.', '').replace('sh.', '')
-            if (keyword in code.lower() or
-                keyword in code_num or
-                keyword in name.lower()):
-                self.filtered_list.append((code, name))
-                if len(self.filtered_list) >= 50:  # 限制显示数量
-                    break
+        result = search_stocks(self.stock_list, keyword, limit=50)
+        if (result == self.filtered_list and self.popup is not None
+                and self.popup.winfo_exists() and self.popup.winfo_viewable()):
+            # 结果与正在显示的相同（如输入法组合过程中的重复写入），不重建列表
+            return
+        self.filtered_list = result
 
         if self.filtered_list:
             self.show_popup()
@@ -337,7 +332,7 @@ class ChanViewerWindow(tk.Toplevel):
     """
 
     window_count = 0
-    instances: List['ChanViewerWindow'] = []
+    instances: Set['ChanViewerWindow'] = set()
 
     # 全局日志队列和重定向器（所有窗口共享）
     _log_queue: Optional[queue.Queue] = None
@@ -358,7 +353,7 @@ class ChanViewerWindow(tk.Toplevel):
         super().__init__(master)
 
         ChanViewerWindow.window_count += 1
-        ChanViewerWindow.instances.append(self)
+        ChanViewerWindow.instances.add(self)
 
         # 设置日志重定向
         ChanViewerWindow.setup_log_redirection()
@@ -424,6 +419,8 @@ class ChanViewerWindow(tk.Toplevel):
         )
         self.history_combo.pack(side=tk.LEFT, padx=(0, 10))
         self.history_combo.bind('<<ComboboxSelected>>', self.on_history_selected)
+        self._history_version = None  # 下拉列表对应的历史记录版本
+        self._history_placeholder = ''
         self._update_history_combo()  # 初始化历史记录列表
 
         # K线周期
@@ -576,6 +573,8 @@ class ChanViewerWindow(tk.Toplevel):
         self.realtime_text.tag_configure("label", foreground="#666666")
         self.realtime_text.tag_configure("value", foreground="#333333")
         self.realtime_text.tag_configure("highlight", foreground="#0066cc", font=("Consolas", 9, "bold"))
+        # 当前面板上显示的实时数据，用于跳过重复重绘
+        self._realtime_shown = None
 
         # 刷新实时行情按钮
         refresh_realtime_btn = ttk.Button(realtime_frame, text="刷新行情", command=self.refresh_realtime_data)
@@ -897,6 +896,12 @@ class ChanViewerWindow(tk.Toplevel):
         if not code:
             return
 
+        # 其他窗口刚获取过同一股票时直接使用缓存，不再启动线程
+        cached = get_cached_realtime_data(code)
+        if cached is not None:
+            self.update_realtime_display(cached)
+            return
+
         # 在后台线程获取实时数据
         def fetch_data():
             try:
@@ -917,6 +922,7 @@ class ChanViewerWindow(tk.Toplevel):
         self.realtime_text.config(state=tk.NORMAL)
         self.realtime_text.delete(1.0, tk.END)
         self.realtime_text.insert(tk.END, f"获取实时数据失败:\n{error_msg}\n\n点击\"刷新行情\"重试")
+        self._realtime_shown = None
         self.realtime_text.config(state=tk.DISABLED)
 
     def update_realtime_display(self, data: StockRealtimeData):
@@ -924,20 +930,25 @@ class ChanViewerWindow(tk.Toplevel):
         if not hasattr(self, 'realtime_text'):
             return
 
-        self.realtime_text.config(state=tk.NORMAL)
-        self.realtime_text.delete(1.0, tk.END)
+        # 与当前显示的是同一份数据（如命中缓存）时不重绘
+        if data == self._realtime_shown:
+            return
+        self._realtime_shown = data
+
+        # 先收集 (文本, 标签) 片段，最后一次 insert 写入
+        segments = []
 
         # 标题：股票名称
-        self.realtime_text.insert(tk.END, f"{data.name}\n", "title")
-        self.realtime_text.insert(tk.END, f"代码: {data.code}\n\n", "label")
+        segments.append((f"{data.name}\n", "title"))
+        segments.append((f"代码: {data.code}\n\n", "label"))
 
         # 当前价格和涨跌
         price_tag = "price_up" if data.change_pct > 0 else ("price_down" if data.change_pct < 0 else "price_flat")
-        self.realtime_text.insert(tk.END, f"{data.latest_price:.2f}", price_tag)
-        self.realtime_text.insert(tk.END, f"  {data.change_pct:+.2f}%\n\n", price_tag)
+        segments.append((f"{data.latest_price:.2f}", price_tag))
+        segments.append((f"  {data.change_pct:+.2f}%\n\n", price_tag))
 
         # 关键指标（用户要求的）
-        self.realtime_text.insert(tk.END, "━━ 核心指标 ━━\n", "highlight")
+        segments.append(("━━ 核心指标 ━━\n", "highlight"))
 
         display_data = data.get_display_dict()
 
@@ -951,10 +962,10 @@ class ChanViewerWindow(tk.Toplevel):
         ]
 
         for label, value in key_fields:
-            self.realtime_text.insert(tk.END, f"{label}: ", "label")
-            self.realtime_text.insert(tk.END, f"{value}\n", "value")
+            segments.append((f"{label}: ", "label"))
+            segments.append((f"{value}\n", "value"))
 
-        self.realtime_text.insert(tk.END, "\n━━ 价格信息 ━━\n", "highlight")
+        segments.append(("\n━━ 价格信息 ━━\n", "highlight"))
 
         price_fields = [
             ("最高", display_data["最高"]),
@@ -964,10 +975,10 @@ class ChanViewerWindow(tk.Toplevel):
         ]
 
         for label, value in price_fields:
-            self.realtime_text.insert(tk.END, f"{label}: ", "label")
-            self.realtime_text.insert(tk.END, f"{value}\n", "value")
+            segments.append((f"{label}: ", "label"))
+            segments.append((f"{value}\n", "value"))
 
-        self.realtime_text.insert(tk.END, "\n━━ 成交信息 ━━\n", "highlight")
+        segments.append(("\n━━ 成交信息 ━━\n", "highlight"))
 
         volume_fields = [
             ("成交量", display_data["成交量"]),
@@ -975,10 +986,10 @@ class ChanViewerWindow(tk.Toplevel):
         ]
 
         for label, value in volume_fields:
-            self.realtime_text.insert(tk.END, f"{label}: ", "label")
-            self.realtime_text.insert(tk.END, f"{value}\n", "value")
+            segments.append((f"{label}: ", "label"))
+            segments.append((f"{value}\n", "value"))
 
-        self.realtime_text.insert(tk.END, "\n━━ 涨跌限制 ━━\n", "highlight")
+        segments.append(("\n━━ 涨跌限制 ━━\n", "highlight"))
 
         limit_fields = [
             ("涨停价", display_data["涨停价"]),
@@ -987,12 +998,15 @@ class ChanViewerWindow(tk.Toplevel):
         ]
 
         for label, value in limit_fields:
-            self.realtime_text.insert(tk.END, f"{label}: ", "label")
-            self.realtime_text.insert(tk.END, f"{value}\n", "value")
+            segments.append((f"{label}: ", "label"))
+            segments.append((f"{value}\n", "value"))
 
         # 更新时间
-        self.realtime_text.insert(tk.END, f"\n更新: {data.update_time.strftime('%H:%M:%S')}", "label")
+        segments.append((f"\n更新: {data.update_time.strftime('%H:%M:%S')}", "label"))
 
+        self.realtime_text.config(state=tk.NORMAL)
+        self.realtime_text.delete(1.0, tk.END)
+        self.realtime_text.insert(tk.END, *(item for segment in segments for item in segment))
         self.realtime_text.config(state=tk.DISABLED)
 
     def plot_chart(self):
@@ -1003,9 +1017,6 @@ class ChanViewerWindow(tk.Toplevel):
         try:
             from Plot.PlotDriver import CPlotDriver
 
-            # 关闭旧的 figure
-            plt.close('all')
-
             plot_config = self.get_plot_config()
 
             # 获取画布实际大小
@@ -1034,18 +1045,18 @@ class ChanViewerWindow(tk.Toplevel):
                 "figure": {
                     "w": fig_width,
                     "h": fig_height,
+                    # 直接画到本窗口画布的 Figure 上，不新建 Figure、不影响其他窗口
+                    "fig": self.fig,
                 }
             }
 
-            plot_driver = CPlotDriver(
+            CPlotDriver(
                 self.chan,
                 plot_config=plot_config,
                 plot_para=plot_para
             )
 
             # 更新画布
-            self.fig = plot_driver.figure
-            self.canvas.figure = self.fig
             self.canvas.draw()
 
         except Exception as e:
@@ -1113,13 +1124,13 @@ class ChanViewerWindow(tk.Toplevel):
     def _update_history_combo(self):
         """更新历史记录下拉框"""
         history = get_stock_history()
-        display_list = history.get_display_list(limit=15)
-        if display_list:
-            self.history_combo['values'] = ['-- 历史记录 --'] + display_list
-            self.history_var.set('-- 历史记录 --')
-        else:
-            self.history_combo['values'] = ['-- 无历史记录 --']
-            self.history_var.set('-- 无历史记录 --')
+        # 历史记录显示内容未变化（如反复分析同一只股票）时不重建下拉列表
+        if history.version != self._history_version:
+            self._history_version = history.version
+            display_list = history.get_display_list(limit=15)
+            self._history_placeholder = '-- 历史记录 --' if display_list else '-- 无历史记录 --'
+            self.history_combo['values'] = [self._history_placeholder] + display_list
+        self.history_var.set(self._history_placeholder)
 
     def on_history_selected(self, event=None):
         """历史记录选择事件"""
@@ -1136,17 +1147,20 @@ class ChanViewerWindow(tk.Toplevel):
         history.add(code, name)
         self._update_history_combo()
 
-    def on_close(self):
-        """窗口关闭事件"""
-        # 停止分析
+    def shutdown(self):
+        """释放窗口资源（停止分析、取消自动刷新、移出实例列表），不销毁窗口"""
         if self.is_analyzing:
             self.stop_analysis()
 
         if self.auto_refresh_job:
             self.after_cancel(self.auto_refresh_job)
+            self.auto_refresh_job = None
+
+        ChanViewerWindow.instances.discard(self)
 
-        if self in ChanViewerWindow.instances:
-            ChanViewerWindow.instances.remove(self)
+    def on_close(self):
+        """窗口关闭事件"""
+        self.shutdown()
 
         # 只有当 master 是 ChanViewerApp（独立运行）时才退出主程序
         # 如果是从 ChanApp 统一入口启动的，不要退出
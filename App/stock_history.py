@@ -42,8 +42,16 @@ class StockHistory:
     def __init__(self):
         self.history_file = get_history_file_path()
         self._history: List[Dict] = []
+        # 显示列表变化时递增，界面据此判断是否需要重建下拉框
+        self.version = 0
+        self._display_cache: Dict[int, List[str]] = {}  # limit -> 显示列表
         self._load()
 
+    def _changed(self):
+        """显示内容发生变化：递增版本号并清空显示列表缓存"""
+        self.version += 1
+        self._display_cache.clear()
+
     def _load(self):
         """从文件加载历史记录"""
         if self.history_file.exists():
@@ -83,6 +91,9 @@ class StockHistory:
                 existing_idx = i
                 break
 
+        # 已在最前且名称相同时只更新访问时间，显示列表不变
+        display_changed = existing_idx != 0 or self._history[0].get('name') != name
+
         # 构建新记录
         record = {
             'code': code,
@@ -101,6 +112,9 @@ class StockHistory:
         if len(self._history) > self.MAX_HISTORY:
             self._history = self._history[:self.MAX_HISTORY]
 
+        if display_changed:
+            self._changed()
+
         # 保存
         self._save()
 
@@ -115,23 +129,29 @@ class StockHistory:
     def remove(self, code: str):
         """删除指定股票的历史记录"""
         self._history = [h for h in self._history if h.get('code') != code]
+        self._changed()
         self._save()
 
     def clear(self):
         """清空所有历史记录"""
         self._history = []
+        self._changed()
         self._save()
 
     def get_display_list(self, limit: int = 10) -> List[str]:
         """
         获取用于显示的格式化列表
         Returns: ["sz.000001  平安银行", ...]
+        结果按 limit 缓存到下次变化，调用方不要修改返回的列表
         """
-        result = []
-        for item in self._history[:limit]:
-            code = item.get('code', '')
-            name = item.get('name', '')
-            result.append(f"{code}  {name}")
+        result = self._display_cache.get(limit)
+        if result is None:
+            result = []
+            for item in self._history[:limit]:
+                code = item.get('code', '')
+                name = item.get('name', '')
+                result.append(f"{code}  {name}")
+            self._display_cache[limit] = result
         return result
 
 
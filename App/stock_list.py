@@ -0,0 +1,114 @@
+"""
+股票列表模块（单级别、多级别分析器共用）
+
+功能：
+    - 读取 download_stock_list.py 生成的股票列表 CSV
+    - 旁路保存 pickle 缓存，文件未变时跳过 CSV 解析
+    - 按代码或名称模糊搜索（各窗口共用一份搜索索引）
+"""
+import bisect
+import csv
+import functools
+import io
+import os
+import pickle
+import sys
+import zlib
+from pathlib import Path
+from typing import List, Optional
+
+
+def _stock_cache_path(csv_path: Path) -> Path:
+    """
+    股票列表 pickle 缓存路径
+    - 普通运行：与 CSV 同目录（stock_list.csv.pkl）
+    - PyInstaller 打包：_MEIPASS 为每次启动新解压的临时目录，缓存放到用户目录下
+    """
+    if getattr(sys, 'frozen', False):
+        if os.name == 'nt':  # Windows
+            base_dir = Path(os.environ.get('APPDATA', Path.home())) / 'ChanTrader'
+        else:  # Linux/Mac
+            base_dir = Path.home() / '.chantrader'
+        base_dir.mkdir(parents=True, exist_ok=True)
+        return base_dir / (csv_path.name + '.pkl')
+    return csv_path.with_name(csv_path.name + '.pkl')
+
+
+@functools.lru_cache(maxsize=None)
+def read_stock_csv(csv_path: Path) -> List[tuple]:
+    """
+    读取股票列表 CSV，返回 [(baostock_code, name), ...]
+    同一文件在进程内只读一次，各窗口拿到的是同一个列表（调用方不要修改）
+
+    缓存头记录 CSV 的 (大小, CRC32)：打包后每次解压出的 CSV 修改时间都会变，按内容判断是否可用，
+    文件未变时直接反序列化，跳过 CSV 解析
+    """
+    raw = csv_path.read_bytes()
+    key = (len(raw), zlib.crc32(raw))
+    pkl_path = _stock_cache_path(csv_path)
+    try:
+        with open(pkl_path, 'rb') as f:
+            size, crc, result = pickle.load(f)
+        if (size, crc) == key:
+            return result
+    except Exception:
+        pass
+
+    reader = csv.DictReader(io.StringIO(raw.decode('utf-8'), newline=''))
+    result = [(row['code'], row['name']) for row in reader]
+    try:
+        with open(pkl_path, 'wb') as f:
+            pickle.dump((*key, result), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # 目录不可写时仅跳过缓存
+        pass
+    return result
+
+
+# 搜索防抖延迟（毫秒）：1 个字符匹配过多且多为输入法组合中途，等久一些；3 个字符以上结果已收敛
+SEARCH_DELAY_SHORT_MS = 300
+SEARCH_DELAY_MS = 200
+SEARCH_DELAY_LONG_KEYWORD_MS = 100
+
+
+def search_delay_ms(keyword: str) -> int:
+    """按关键字长度选择搜索防抖延迟"""
+    if len(keyword) <= 1:
+        return SEARCH_DELAY_SHORT_MS
+    if len(keyword) >= 3:
+        return SEARCH_DELAY_LONG_KEYWORD_MS
+    return SEARCH_DELAY_MS
+
+
+# 股票搜索索引：(股票列表, 全部 "代码\t名称" 小写后以换行拼接的文本, 各行起始偏移)
+_search_index: Optional[tuple] = None
+
+
+def search_stocks(stock_list: List[tuple], keyword: str, limit: int = 50) -> List[tuple]:
+    """
+    在股票列表中按代码或名称模糊搜索（keyword 需已转为小写）
+
+    整个列表预先拼接成一段小写文本，搜索时用 str.find 在 C 层扫描，
+    命中后用 bisect 换算成行号，避免逐行做多次子串判断
+    """
+    global _search_index
+    if _search_index is None or _search_index[0] is not stock_list:
+        lines = [f"{code}\t{name}".lower() for code, name in stock_list]
+        starts = []
+        pos = 0
+        for line in lines:
+            starts.append(pos)
+            pos += len(line) + 1
+        _search_index = (stock_list, "\n".join(lines), starts)
+    _, text, starts = _search_index
+
+    result = []
+    pos = text.find(keyword)
+    while pos >= 0 and len(result) < limit:
+        row = bisect.bisect_right(starts, pos) - 1
+        result.append(stock_list[row])
+        # 同一行只取一次，从下一行开头继续查找
+        if row + 1 >= len(starts):
+            break
+        pos = text.find(keyword, starts[row + 1])
+    return result
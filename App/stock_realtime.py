@@ -11,6 +11,7 @@
     - 使用单只股票接口，速度快（约2秒），而非全量接口（60+秒）
 """
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict
 from dataclasses import dataclass
@@ -105,7 +106,9 @@ class StockRealtimeService:
 
     def __init__(self):
         self._cache: Dict[str, tuple] = {}  # {code: (data, timestamp)}
-        self._lock = threading.Lock()
+        self._lock = threading.Lock()  # 保护 _cache 和 _code_locks
+        # 每只股票一把锁：同一股票的并发请求合并为一次下载，不同股票之间互不阻塞
+        self._code_locks: Dict[str, threading.Lock] = {}
 
     def _normalize_code(self, code: str) -> str:
         """标准化股票代码，返回纯数字代码"""
@@ -116,6 +119,17 @@ class StockRealtimeService:
             return code[2:]
         return code
 
+    def get_cached(self, code: str) -> Optional[StockRealtimeData]:
+        """只读缓存：返回未过期的实时数据，没有则返回 None（不发起网络请求）"""
+        code_num = self._normalize_code(code)
+        with self._lock:
+            entry = self._cache.get(code_num)
+        if entry is not None:
+            data, cache_time = entry
+            if (datetime.now() - cache_time).total_seconds() < self.CACHE_TTL:
+                return data
+        return None
+
     def get_stock_data(self, code: str) -> Optional[StockRealtimeData]:
         """
         获取单只股票的实时数据（快速接口，约2秒）
@@ -131,19 +145,22 @@ class StockRealtimeService:
         code_num = self._normalize_code(code)
 
         with self._lock:
-            # 检查缓存
-            if code_num in self._cache:
-                data, cache_time = self._cache[code_num]
-                if (datetime.now() - cache_time).total_seconds() < self.CACHE_TTL:
-                    return data
+            code_lock = self._code_locks.setdefault(code_num, threading.Lock())
+
+        with code_lock:
+            # 检查缓存（等待同一股票的其他请求完成后，通常直接命中）
+            data = self.get_cached(code_num)
+            if data is not None:
+                return data
 
             try:
-                # 获取个股基本信息（市值、股本等）
-                info_df = ak.stock_individual_info_em(symbol=code_num)
+                # 个股基本信息（市值、股本等）和盘口数据（价格、换手率、量比等）两个接口并发请求
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    info_future = executor.submit(ak.stock_individual_info_em, symbol=code_num)
+                    bid_future = executor.submit(ak.stock_bid_ask_em, symbol=code_num)
+                    info_df = info_future.result()
+                    bid_df = bid_future.result()
                 info_dict = dict(zip(info_df['item'], info_df['value']))
-
-                # 获取盘口数据（价格、换手率、量比等）
-                bid_df = ak.stock_bid_ask_em(symbol=code_num)
                 bid_dict = dict(zip(bid_df['item'], bid_df['value']))
 
                 # 安全获取数值
@@ -187,7 +204,8 @@ class StockRealtimeService:
                 )
 
                 # 更新缓存
-                self._cache[code_num] = (data, datetime.now())
+                with self._lock:
+                    self._cache[code_num] = (data, datetime.now())
 
                 return data
 
@@ -201,15 +219,18 @@ class StockRealtimeService:
             self._cache.clear()
 
 
-# 全局单例
+# 全局单例（多个窗口的后台线程可能同时首次获取，创建时加锁）
 _realtime_service: Optional[StockRealtimeService] = None
+_realtime_service_lock = threading.Lock()
 
 
 def get_realtime_service() -> StockRealtimeService:
     """获取实时数据服务单例"""
     global _realtime_service
     if _realtime_service is None:
-        _realtime_service = StockRealtimeService()
+        with _realtime_service_lock:
+            if _realtime_service is None:
+                _realtime_service = StockRealtimeService()
     return _realtime_service
 
 
@@ -226,6 +247,19 @@ def get_stock_realtime_data(code: str) -> Optional[StockRealtimeData]:
     return get_realtime_service().get_stock_data(code)
 
 
+def get_cached_realtime_data(code: str) -> Optional[StockRealtimeData]:
+    """
+    便捷函数：只从缓存获取实时数据，不发起网络请求
+
+    Args:
+        code: 股票代码
+
+    Returns:
+        未过期的 StockRealtimeData 对象，没有则返回 None
+    """
+    return get_realtime_service().get_cached(code)
+
+
 # 测试代码
 if __name__ == "__main__":
     import time
@@ -1,3 +1,5 @@
+from typing import Dict
+
 import akshare as ak
 import pandas as pd
 
@@ -85,11 +87,52 @@ def create_item_dict(row, autype, is_minute=False):
 class CAkshare(CCommonStockApi):
     """使用 akshare 获取A股数据"""
 
+    # 预取的K线数据 {(code, k_type, begin_date, end_date, autype): DataFrame}，被 get_kl_data 取用一次后移除
+    _prefetched: Dict[tuple, pd.DataFrame] = {}
+
     def __init__(self, code, k_type=KL_TYPE.K_DAY, begin_date=None, end_date=None, autype=AUTYPE.QFQ):
         super(CAkshare, self).__init__(code, k_type, begin_date, end_date, autype)
 
+    @classmethod
+    def prefetch(cls, code, k_type=KL_TYPE.K_DAY, begin_date=None, end_date=None, autype=AUTYPE.QFQ) -> pd.DataFrame:
+        """
+        提前下载K线数据（纯网络IO），之后以相同参数构造的 CChan 直接使用该数据计算
+
+        Returns:
+            pd.DataFrame: 下载到的原始K线数据
+        """
+        df = cls(code, k_type, begin_date, end_date, autype).fetch_kl_df()
+        cls.put_prefetched(code, k_type, begin_date, end_date, autype, df)
+        return df
+
+    @classmethod
+    def put_prefetched(cls, code, k_type, begin_date, end_date, autype, df: pd.DataFrame):
+        """登记由外部下载好的K线数据（列名需与 ak.stock_zh_a_hist 一致）"""
+        cls._prefetched[(code, k_type, begin_date, end_date, autype)] = df
+
+    @classmethod
+    def discard_prefetched(cls, code, k_type, begin_date, end_date, autype):
+        """丢弃一份尚未被使用的预取数据（预取后不再构造对应的 CChan 时调用）"""
+        cls._prefetched.pop((code, k_type, begin_date, end_date, autype), None)
+
+    @classmethod
+    def clear_prefetched(cls):
+        """丢弃所有尚未被使用的预取数据"""
+        cls._prefetched.clear()
+
     def get_kl_data(self):
         """获取K线数据"""
+        df = self._prefetched.pop((self.code, self.k_type, self.begin_date, self.end_date, self.autype), None)
+        if df is None:
+            df = self.fetch_kl_df()
+
+        # 遍历每一行生成K线单元
+        is_minute = self._is_minute_type()
+        for _, row in df.iterrows():
+            yield CKLine_Unit(create_item_dict(row, self.autype, is_minute=is_minute))
+
+    def fetch_kl_df(self) -> pd.DataFrame:
+        """从 akshare 下载K线数据，返回可直接逐行转换为K线单元的 DataFrame"""
         # 转换复权类型
         adjust_dict = {
             AUTYPE.QFQ: "qfq",
@@ -147,10 +190,6 @@ class CAkshare(CCommonStockApi):
 
                 # 过滤无效数据：收盘价为0的才是真正无效的
                 df = df[df['收盘'] > 0]
-
-            # 遍历每一行生成K线单元
-            for _, row in df.iterrows():
-                yield CKLine_Unit(create_item_dict(row, self.autype, is_minute=True))
         elif self.is_stock:
             # 个股日线/周线/月线数据
             df = ak.stock_zh_a_hist(
@@ -160,9 +199,6 @@ class CAkshare(CCommonStockApi):
                 end_date=end_date,
                 adjust=adjust
             )
-            # 遍历每一行生成K线单元
-            for _, row in df.iterrows():
-                yield CKLine_Unit(create_item_dict(row, self.autype, is_minute=False))
         else:
             # 指数数据
             df = ak.stock_zh_index_daily(symbol=self.code)
@@ -182,9 +218,7 @@ class CAkshare(CCommonStockApi):
                 df['成交额'] = 0
             df = df[(df['日期'] >= start_date) & (df['日期'] <= end_date)]
 
-            # 遍历每一行生成K线单元
-            for _, row in df.iterrows():
-                yield CKLine_Unit(create_item_dict(row, self.autype, is_minute=False))
+        return df
 
     def SetBasciInfo(self):
         """设置基本信息"""
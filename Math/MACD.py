@@ -2,6 +2,9 @@ from typing import List
 
 
 class CMACD_item:
+    # 每根K线一个实例，用 __slots__ 省去实例字典
+    __slots__ = ('fast_ema', 'slow_ema', 'DIF', 'DEA', 'macd')
+
     def __init__(self, fast_ema, slow_ema, DIF, DEA):
         self.fast_ema = fast_ema
         self.slow_ema = slow_ema
@@ -21,9 +24,10 @@ class CMACD:
         if not self.macd_info:
             self.macd_info.append(CMACD_item(fast_ema=value, slow_ema=value, DIF=0, DEA=0))
         else:
-            _fast_ema = (2 * value + (self.fastperiod - 1) * self.macd_info[-1].fast_ema) / (self.fastperiod + 1)
-            _slow_ema = (2 * value + (self.slowperiod - 1) * self.macd_info[-1].slow_ema) / (self.slowperiod + 1)
+            pre = self.macd_info[-1]
+            _fast_ema = (2 * value + (self.fastperiod - 1) * pre.fast_ema) / (self.fastperiod + 1)
+            _slow_ema = (2 * value + (self.slowperiod - 1) * pre.slow_ema) / (self.slowperiod + 1)
             _dif = _fast_ema - _slow_ema
-            _dea = (2 * _dif + (self.signalperiod - 1) * self.macd_info[-1].DEA) / (self.signalperiod + 1)
-            self.macd_info.append(CMACD_item(fast_ema=_fast_ema, slow_ema=_slow_ema, DIF=_dif, DEA=_dea))
+            _dea = (2 * _dif + (self.signalperiod - 1) * pre.DEA) / (self.signalperiod + 1)
+            self.macd_info.append(CMACD_item(_fast_ema, _slow_ema, _dif, _dea))
         return self.macd_info[-1]
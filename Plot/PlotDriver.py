@@ -1,4 +1,5 @@
 import inspect
+from contextlib import contextmanager
 from typing import Dict, List, Literal, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
@@ -105,12 +106,19 @@ def create_figure(plot_macd: Dict[KL_TYPE, bool], figure_config, lv_lst: List[KL
             total_h += h
             gridspec_kw.append(1)
             sub_pic_cnt += 1
-    figure, axes = plt.subplots(
-        sub_pic_cnt,
-        1,
-        figsize=(w, total_h),
-        gridspec_kw={'height_ratios': gridspec_kw}
-    )
+    figure = figure_config.get('fig')
+    if figure is not None:
+        # 复用调用方传入的 Figure（如嵌入界面的画布），清空后重新划分子图
+        figure.clf()
+        figure.set_size_inches(w, total_h)
+        axes = figure.subplots(sub_pic_cnt, 1, gridspec_kw={'height_ratios': gridspec_kw})
+    else:
+        figure, axes = plt.subplots(
+            sub_pic_cnt,
+            1,
+            figsize=(w, total_h),
+            gridspec_kw={'height_ratios': gridspec_kw}
+        )
     try:
         axes[0]
     except Exception:  # 只有一个级别，且不需要画macd
@@ -162,6 +170,8 @@ class CPlotDriver:
         plot_config = parse_plot_config(plot_config, chan.lv_list)
         plot_metas = GetPlotMeta(chan, figure_config)
         self.lv_lst = chan.lv_list[:len(plot_metas)]
+        # 每个级别下按 plot_config 键分组的 artist，便于调用方 set_visible 切换
+        self.artist_groups: Dict[KL_TYPE, Dict[str, List]] = {}
 
         x_range = self.GetRealXrange(figure_config, plot_metas[0])
         plot_macd: Dict[KL_TYPE, bool] = {kl_type: conf.get("plot_macd", False) for kl_type, conf in plot_config.items()}
@@ -238,45 +248,70 @@ class CPlotDriver:
 
     def DrawElement(self, plot_config: Dict[str, bool], meta: CChanPlotMeta, ax: Axes, lv, plot_para, ax_macd: Optional[Axes], x_limits):
         if plot_config.get("plot_kline", False):
-            self.draw_klu(meta, ax, **plot_para.get('kl', {}))
+            with self._track_artists(lv, "plot_kline", ax):
+                self.draw_klu(meta, ax, **plot_para.get('kl', {}))
         if plot_config.get("plot_kline_combine", False):
-            self.draw_klc(meta, ax, **plot_para.get('klc', {}))
+            with self._track_artists(lv, "plot_kline_combine", ax):
+                self.draw_klc(meta, ax, **plot_para.get('klc', {}))
         if plot_config.get("plot_bi", False):
-            self.draw_bi(meta, ax, lv, **plot_para.get('bi', {}))
+            with self._track_artists(lv, "plot_bi", ax):
+                self.draw_bi(meta, ax, lv, **plot_para.get('bi', {}))
         if plot_config.get("plot_seg", False):
-            self.draw_seg(meta, ax, lv, **plot_para.get('seg', {}))
+            with self._track_artists(lv, "plot_seg", ax):
+                self.draw_seg(meta, ax, lv, **plot_para.get('seg', {}))
         if plot_config.get("plot_segseg", False):
-            self.draw_segseg(meta, ax, **plot_para.get('segseg', {}))
+            with self._track_artists(lv, "plot_segseg", ax):
+                self.draw_segseg(meta, ax, **plot_para.get('segseg', {}))
         if plot_config.get("plot_eigen", False):
-            self.draw_eigen(meta, ax, **plot_para.get('eigen', {}))
+            with self._track_artists(lv, "plot_eigen", ax):
+                self.draw_eigen(meta, ax, **plot_para.get('eigen', {}))
         if plot_config.get("plot_segeigen", False):
-            self.draw_segeigen(meta, ax, **plot_para.get('segeigen', {}))
+            with self._track_artists(lv, "plot_segeigen", ax):
+                self.draw_segeigen(meta, ax, **plot_para.get('segeigen', {}))
         if plot_config.get("plot_zs", False):
-            self.draw_zs(meta, ax, **plot_para.get('zs', {}))
+            with self._track_artists(lv, "plot_zs", ax):
+                self.draw_zs(meta, ax, **plot_para.get('zs', {}))
         if plot_config.get("plot_segzs", False):
-            self.draw_segzs(meta, ax, **plot_para.get('segzs', {}))
+            with self._track_artists(lv, "plot_segzs", ax):
+                self.draw_segzs(meta, ax, **plot_para.get('segzs', {}))
         if plot_config.get("plot_macd", False):
             assert ax_macd is not None
-            self.draw_macd(meta, ax_macd, x_limits, **plot_para.get('macd', {}))
+            with self._track_artists(lv, "plot_macd", ax_macd):
+                self.draw_macd(meta, ax_macd, x_limits, **plot_para.get('macd', {}))
         if plot_config.get("plot_mean", False):
-            self.draw_mean(meta, ax, **plot_para.get('mean', {}))
+            with self._track_artists(lv, "plot_mean", ax):
+                self.draw_mean(meta, ax, **plot_para.get('mean', {}))
         if plot_config.get("plot_channel", False):
-            self.draw_channel(meta, ax, **plot_para.get('channel', {}))
+            with self._track_artists(lv, "plot_channel", ax):
+                self.draw_channel(meta, ax, **plot_para.get('channel', {}))
         if plot_config.get("plot_boll", False):
-            self.draw_boll(meta, ax, **plot_para.get('boll', {}))
+            with self._track_artists(lv, "plot_boll", ax):
+                self.draw_boll(meta, ax, **plot_para.get('boll', {}))
         if plot_config.get("plot_bsp", False):
-            self.draw_bs_point(meta, ax, **plot_para.get('bsp', {}))
+            with self._track_artists(lv, "plot_bsp", ax):
+                self.draw_bs_point(meta, ax, **plot_para.get('bsp', {}))
         if plot_config.get("plot_segbsp", False):
-            self.draw_seg_bs_point(meta, ax, **plot_para.get('seg_bsp', {}))
+            with self._track_artists(lv, "plot_segbsp", ax):
+                self.draw_seg_bs_point(meta, ax, **plot_para.get('seg_bsp', {}))
         if plot_config.get("plot_demark", False):
-            self.draw_demark(meta, ax, **plot_para.get('demark', {}))
+            with self._track_artists(lv, "plot_demark", ax):
+                self.draw_demark(meta, ax, **plot_para.get('demark', {}))
         if plot_config.get("plot_marker", False):
-            self.draw_marker(meta, ax, **plot_para.get('marker', {'markers': {}}))
+            with self._track_artists(lv, "plot_marker", ax):
+                self.draw_marker(meta, ax, **plot_para.get('marker', {'markers': {}}))
         if plot_config.get("plot_rsi", False):
             self.draw_rsi(meta, ax.twinx(), **plot_para.get('rsi', {}))
         if plot_config.get("plot_kdj", False):
             self.draw_kdj(meta, ax.twinx(), **plot_para.get('kdj', {}))
 
+    @contextmanager
+    def _track_artists(self, lv, name: str, ax: Axes):
+        """记录某个绘图元素新增到 ax 上的所有 artist，供外部切换显示而无需重画"""
+        before = set(ax.get_children())
+        yield
+        added = [artist for artist in ax.get_children() if artist not in before]
+        self.artist_groups.setdefault(lv, {}).setdefault(name, []).extend(added)
+
     def ShowDrawFuncHelper(self):
         # 写README的时候显示所有画图函数的参数和默认值
         for func in dir(self):
@@ -60,9 +60,17 @@ def build():
         "--hidden-import=numpy",
         "--hidden-import=matplotlib",
         "--hidden-import=matplotlib.backends.backend_tkagg",
+        # 子窗口模块由 chan_app 按名称动态导入，静态分析找不到
+        "--hidden-import=chan_viewer_tk",
+        "--hidden-import=chan_viewer_multilevel_tk",
+        "--hidden-import=ashare_bsp_scanner_tk",
+        "--hidden-import=stock_history",
+        "--hidden-import=stock_list",
+        "--hidden-import=stock_realtime",
 
         # 路径设置
         f"--paths={project_root}",
+        f"--paths={app_dir}",
         f"--specpath={project_root / 'build'}",
         f"--distpath={project_root / 'dist'}",
         f"--workpath={project_root / 'build' / 'temp'}",